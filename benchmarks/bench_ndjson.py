@@ -0,0 +1,49 @@
+'''
+Пропускная способность импорта и экспорта NDJSON
+
+python -m benchmarks.bench_ndjson --keys 200000 --workers 4
+'''
+import argparse
+import os
+import tempfile
+import time
+from jsoner import Database
+
+def measure(name: str, count: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<28} {elapsed:8.3f} с  {count / elapsed:12,.0f} ключей/с')
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = Database(os.path.join(folder, 'source.json'))
+        source.load([(f'user:{number}', {'id': number, 'name': f'user {number}', 'tags': ['a', 'b']}, None)
+                     for number in range(args.keys)], validate=False)
+
+        path = os.path.join(folder, 'data.ndjson')
+        measure('export_ndjson', args.keys, lambda: source.export_ndjson(path))
+        print(f'{"размер файла":<28} {os.path.getsize(path) / 2**20:8.1f} МБ')
+
+        def run_add():
+            db = Database(os.path.join(folder, 'add.json'))
+            for key, value in source.data.items():
+                if key != source.settings: db.add(key, value)
+
+        def run_import(workers, validate):
+            db = Database(os.path.join(folder, f'import_{workers}_{validate}.json'))
+            db.import_ndjson(path, batch_size=args.batch_size, workers=workers, validate=validate)
+
+        measure('add по одному ключу', args.keys, run_add)
+        measure('import_ndjson', args.keys, lambda: run_import(None, True))
+        measure('import_ndjson validate=False', args.keys, lambda: run_import(None, False))
+        measure(f'import_ndjson workers={args.workers}', args.keys, lambda: run_import(args.workers, True))
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
 from .database import Database
 from .cluster import Cluster
 from .tags import NewTag
+from .feed import ChangeFeed
+from .counters import Counters
+from .shared import SharedDatabase
+from .eviction import Eviction
+from .replication import Primary, Replica
 from . import errors
 from . import tags
\ No newline at end of file
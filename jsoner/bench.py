@@ -0,0 +1,426 @@
+'''
+Нагрузочное тестирование `Database` и `Cluster`
+
+Запуск профиля нагрузки и запись отчета:
+
+`python -m jsoner.bench run --profile mixed --threads 4 --duration 10 --output base.json`
+
+Несколько процессов работают с базой данных через `Server` и `RemoteDatabase`:
+
+`python -m jsoner.bench run --profile ttl --processes 4 --target cluster --output new.json`
+
+Страница сравнения отчетов:
+
+`python -m jsoner.bench compare base.json new.json --output compare.html`
+'''
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import nullcontext
+from .cluster import Cluster
+from .database import Database
+from .server import Server, RemoteDatabase
+from .tags import ttl_tag
+
+profiles = {
+    # 90% чтений, остальное - перезапись и добавление ключей с тегами
+    'mixed': {'get': 90, 'set': 7, 'add': 3},
+    # ключи с коротким TTL постоянно добавляются и истекают при чтении
+    'ttl': {'get': 40, 'churn': 40, 'get_churn': 20},
+    'counters': {'incr': 90, 'get': 10},
+}
+
+counters = 100
+
+def value(rng: random.Random) -> dict:
+    return {'id': rng.randrange(10**6), 'name': f'user {rng.randrange(10**6)}', 'score': rng.random()}
+
+def operation(name: str, db, rng: random.Random, keys: int, worker: int, number: int, ttl: float) -> None:
+    '''`Выполнить одну операцию профиля`'''
+
+    match name:
+        case 'get': db.get(f'key:{rng.randrange(keys)}')
+        case 'set': db.set(f'key:{rng.randrange(keys)}', value(rng))
+        case 'add': db.add(f'new:{worker}:{number}', value(rng), {ttl_tag: 3600})
+        case 'churn': db.add(f'ttl:{worker}:{number}', value(rng), {ttl_tag: ttl})
+        case 'get_churn': db.get(f'ttl:{worker}:{rng.randrange(number + 1)}')
+        case 'incr': db.incr(f'counter:{rng.randrange(counters)}')
+        case _: raise ValueError(f'Неизвестная операция {name}')
+
+def route(databases: list, key: str):
+    '''`База данных кластера для ключа`'''
+    return databases[zlib.crc32(key.encode()) % len(databases)]
+
+class Router:
+    '''`Распределение ключей по базам данных кластера`'''
+
+    def __init__(self, databases: list):
+        self.databases = databases
+
+    def __getattr__(self, op: str):
+        return lambda key, *args: getattr(route(self.databases, key), op)(key, *args)
+
+def work(db, config: dict, worker: int, done: list | None = None, lock=None) -> dict:
+    '''
+    `Выполнять операции профиля до конца замера`
+
+    :param done: Список, в котором обновляется количество выполненных операций этого исполнителя
+    :param lock: Блокировка, под которой выполняется каждая операция
+    :return: Задержки операций в наносекундах по видам операций и количество ошибок
+    '''
+    rng = random.Random(config['seed'] * 1000 + worker)
+    weights = profiles[config['profile']]
+    names, cum_weights = list(weights), []
+
+    for weight in weights.values(): cum_weights.append((cum_weights[-1] if cum_weights else 0) + weight)
+
+    latencies = {name: [] for name in names}
+    errors = dict.fromkeys(names, 0)
+    lock = lock or nullcontext()
+    deadline = time.perf_counter() + config['duration']
+    number = 0
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, cum_weights=cum_weights)[0]
+        start = time.perf_counter_ns()
+
+        try:
+            with lock: operation(name, db, rng, config['keys'], worker, number, config['ttl'])
+        except Exception:
+            errors[name] += 1
+
+        latencies[name].append(time.perf_counter_ns() - start)
+        number += 1
+        if done is not None: done[worker] = number
+
+    return {'latencies': latencies, 'errors': errors}
+
+def work_process(address, names: list | None, config: dict, worker: int, done, results) -> None:
+    '''`Исполнитель в отдельном процессе`'''
+
+    if names: databases = [RemoteDatabase(address, db=name, pool_size=1) for name in names]
+    else: databases = [RemoteDatabase(address, pool_size=1)]
+
+    results.put((worker, work(Router(databases), config, worker, done)))
+
+    for db in databases: db.close()
+
+def prepare(config: dict) -> tuple:
+    '''
+    `Создать базу данных или кластер и заполнить начальными ключами`
+
+    :return: Цель для сервера, список баз данных и функция сохранения
+    '''
+    folder = config['folder']
+
+    if config['target'] == 'cluster':
+        names = [f'db{number}' for number in range(config['databases'])]
+        for name in names: Database(os.path.join(folder, f'{name}.json')).commit()
+
+        target = type('bench', (Cluster,), {'folder_path': folder})
+        databases = [getattr(target, name) for name in names]
+        commit = target.commit_all
+    else:
+        target = Database(os.path.join(folder, 'data.json'))
+        databases = [target]
+        commit = target.commit
+
+    rng = random.Random(config['seed'])
+
+    for number in range(config['keys']):
+        key = f'key:{number}'
+        route(databases, key).add(key, value(rng), {ttl_tag: 3600} if number % 2 else {})
+
+    for number in range(counters):
+        key = f'counter:{number}'
+        route(databases, key).add(key, 0)
+
+    commit()
+
+    return target, databases, commit
+
+def rss(pids: list[int] = ()) -> int:
+    '''`Занятая память текущего процесса и процессов pids в байтах`'''
+
+    total = 0
+
+    for pid in ['self', *pids]:
+        try:
+            with open(f'/proc/{pid}/statm') as file: total += int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            # без /proc доступен только максимум памяти текущего процесса
+            if pid == 'self': total += resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return total
+
+def folder_size(folder: str) -> int:
+    '''`Размер файлов в папке в байтах`'''
+
+    total = 0
+
+    for name in os.listdir(folder):
+        try: total += os.path.getsize(os.path.join(folder, name))
+        except OSError: ...
+
+    return total
+
+def percentiles(latencies: list[int]) -> dict:
+    '''`Перцентили задержек в миллисекундах`'''
+
+    if not latencies: return {'count': 0, 'p50': None, 'p99': None, 'p999': None, 'max': None}
+
+    latencies = sorted(latencies)
+
+    def at(quantile):
+        return latencies[min(int(quantile * len(latencies)), len(latencies) - 1)] / 1e6
+
+    return {'count': len(latencies), 'p50': at(0.5), 'p99': at(0.99), 'p999': at(0.999), 'max': latencies[-1] / 1e6}
+
+def run(profile: str = 'mixed', target: str = 'database', threads: int = 1, processes: int = 0, duration: float = 10.0,
+        keys: int = 10000, databases: int = 4, ttl: float = 1.0, interval: float = 1.0, folder: str | None = None,
+        name: str | None = None, seed: int = 0) -> dict:
+    '''
+    `Запустить профиль нагрузки`
+
+    :param profile: Профиль нагрузки: `mixed`, `ttl` или `counters`
+    :param target: `database` - одна база данных, `cluster` - кластер из `databases` баз данных
+    :param threads: Количество потоков, которые работают с базой данных в этом процессе
+    :param processes: Количество процессов, которые работают с базой данных через сервер. Если указано, `threads` не используется
+    :param duration: Длительность замера в секундах
+    :param keys: Количество начальных ключей
+    :param databases: Количество баз данных кластера
+    :param ttl: TTL ключей профиля `ttl` в секундах
+    :param interval: Как часто в секундах сохранять данные и записывать показатели
+    :param folder: Папка для файлов баз данных. По умолчанию - временная папка
+    :param name: Название замера в отчете
+    :param seed: Начальное значение генератора случайных чисел
+    :return: Отчет
+    '''
+    if profile not in profiles: raise ValueError(f'Неизвестный профиль {profile}. Доступны: {", ".join(profiles)}')
+    if target not in ('database', 'cluster'): raise ValueError(f'Неизвестная цель {target}. Доступны: database, cluster')
+
+    with tempfile.TemporaryDirectory() if folder is None else nullcontext(folder) as folder:
+        os.makedirs(folder, exist_ok=True)
+
+        workers = processes or threads
+        config = {
+            'profile': profile, 'target': target, 'threads': 0 if processes else threads, 'processes': processes,
+            'duration': duration, 'keys': keys, 'databases': databases if target == 'cluster' else 1, 'ttl': ttl,
+            'interval': interval, 'seed': seed, 'folder': folder
+        }
+
+        server_target, members, commit = prepare(config)
+        start_size = folder_size(folder)
+
+        if processes:
+            server = Server(server_target, os.path.join(folder, 'bench.sock'))
+            lock = server.lock
+            names = server_target.databases if target == 'cluster' else None
+            done = multiprocessing.Array('q', workers, lock=False)
+            results = multiprocessing.Queue()
+            runners = [multiprocessing.Process(target=work_process, args=(server.address, names, config, worker, done, results))
+                       for worker in range(workers)]
+        else:
+            server = None
+            lock = threading.Lock()
+            done = [0] * workers
+            results = {}
+            router = Router(members)
+
+            def work_thread(worker):
+                results[worker] = work(router, config, worker, done, lock)
+
+            runners = [threading.Thread(target=work_thread, args=(worker,)) for worker in range(workers)]
+
+        timeline = []
+        began = time.perf_counter()
+
+        for runner in runners: runner.start()
+
+        # сервер запускается после создания процессов, чтобы они не копировали его поток
+        if server is not None: server.start()
+
+        pids = [runner.pid for runner in runners] if processes else []
+        previous = (began, 0)
+
+        while any(runner.is_alive() for runner in runners) and (not processes or results.qsize() < workers):
+            time.sleep(min(interval, max(began + duration - time.perf_counter(), 0.01)))
+
+            with lock: commit()
+
+            now, ops = time.perf_counter(), sum(done)
+            timeline.append({
+                'time': round(now - began, 3), 'ops': ops, 'throughput': (ops - previous[1]) / max(now - previous[0], 1e-9),
+                'rss': rss(pids), 'file_size': folder_size(folder)
+            })
+            previous = (now, ops)
+
+            if now - began > duration + 30: raise TimeoutError('Исполнители не завершились вовремя')
+
+        if processes: results = dict(results.get() for _ in range(workers))
+
+        for runner in runners: runner.join()
+
+        elapsed = time.perf_counter() - began
+
+        if server is not None: server.close()
+
+        with lock: commit()
+
+        latencies, errors = {}, {}
+
+        for result in results.values():
+            for op, values in result['latencies'].items(): latencies.setdefault(op, []).extend(values)
+            for op, count in result['errors'].items(): errors[op] = errors.get(op, 0) + count
+
+        total = sum(len(values) for values in latencies.values())
+
+        return {
+            'name': name or f'{profile} {target} {f"{processes} процессов" if processes else f"{threads} потоков"}',
+            'time': time.time(),
+            'config': {**config, 'folder': None},
+            'summary': {
+                'ops': total,
+                'elapsed': elapsed,
+                'throughput': total / elapsed,
+                'latency': percentiles([value for values in latencies.values() for value in values]),
+                'operations': {op: percentiles(values) for op, values in latencies.items()},
+                'errors': errors,
+                'rss_max': max((point['rss'] for point in timeline), default=rss()),
+                'file_size_start': start_size,
+                'file_size_end': folder_size(folder),
+            },
+            'timeline': timeline,
+        }
+
+def chart(reports: list[dict], metric: str, title: str, width: int = 640, height: int = 200) -> str:
+    '''`SVG-график показателя по времени для нескольких отчетов`'''
+
+    colors = ('#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd')
+    points = [[(point['time'], point[metric]) for point in report['timeline']] for report in reports]
+    max_x = max((x for line in points for x, _ in line), default=1) or 1
+    max_y = max((y for line in points for _, y in line), default=1) or 1
+
+    lines = []
+
+    for number, line in enumerate(points):
+        coords = ' '.join(f'{x / max_x * (width - 60) + 50:.1f},{height - 20 - y / max_y * (height - 40):.1f}' for x, y in line)
+        lines.append(f'<polyline fill="none" stroke="{colors[number % len(colors)]}" stroke-width="2" points="{coords}"/>')
+
+    return (
+        f'<h3>{html.escape(title)}</h3>'
+        f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">'
+        f'<line x1="50" y1="{height - 20}" x2="{width - 10}" y2="{height - 20}" stroke="#999"/>'
+        f'<line x1="50" y1="20" x2="50" y2="{height - 20}" stroke="#999"/>'
+        f'<text x="0" y="25" font-size="11">{max_y:,.0f}</text>'
+        f'<text x="{width - 50}" y="{height - 5}" font-size="11">{max_x:.1f} с</text>'
+        f'{"".join(lines)}</svg>'
+    )
+
+def compare(reports: list[dict]) -> str:
+    '''`Статическая HTML-страница сравнения отчетов`'''
+
+    def row(title, values, better='more'):
+        cells = []
+
+        for number, value in enumerate(values):
+            text = '—' if value is None else f'{value:,.3f}' if isinstance(value, float) else f'{value:,}'
+
+            if number and value is not None and values[0]:
+                change = (value - values[0]) / values[0] * 100
+                good = change >= 0 if better == 'more' else change <= 0
+                text += f' <span style="color: {"green" if good else "red"}">({change:+.1f}%)</span>'
+
+            cells.append(f'<td>{text}</td>')
+
+        return f'<tr><th>{html.escape(title)}</th>{"".join(cells)}</tr>'
+
+    summaries = [report['summary'] for report in reports]
+    rows = [
+        row('Операций в секунду', [summary['throughput'] for summary in summaries]),
+        row('Операций', [summary['ops'] for summary in summaries]),
+        *(row(f'Задержка {name}, мс', [summary['latency'][name] for summary in summaries], 'less') for name in ('p50', 'p99', 'p999', 'max')),
+        row('Ошибок', [sum(summary['errors'].values()) for summary in summaries], 'less'),
+        row('Память (максимум), байт', [summary['rss_max'] for summary in summaries], 'less'),
+        row('Размер файлов в конце, байт', [summary['file_size_end'] for summary in summaries], 'less'),
+    ]
+
+    for op in sorted({op for summary in summaries for op in summary['operations']}):
+        for name in ('p50', 'p99'):
+            rows.append(row(f'{op} {name}, мс', [summary['operations'].get(op, {}).get(name) for summary in summaries], 'less'))
+
+    configs = ''.join(f'<li><b>{html.escape(report["name"])}</b>: {html.escape(json.dumps(report["config"], ensure_ascii=False))}</li>'
+                      for report in reports)
+    header = ''.join(f'<th>{html.escape(report["name"])}</th>' for report in reports)
+
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Jsoner: сравнение замеров</title>'
+        '<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}'
+        'td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}th:first-child{text-align:left}</style></head><body>'
+        f'<h1>Сравнение замеров</h1><ul>{configs}</ul>'
+        f'<table><tr><th></th>{header}</tr>{"".join(rows)}</table>'
+        f'{chart(reports, "throughput", "Операций в секунду")}'
+        f'{chart(reports, "rss", "Память, байт")}'
+        f'{chart(reports, "file_size", "Размер файлов, байт")}'
+        '</body></html>'
+    )
+
+def main(argv: list[str] | None = None) -> None:
+
+    parser = argparse.ArgumentParser(prog='python -m jsoner.bench', description='Нагрузочное тестирование Jsoner')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Запустить профиль нагрузки и записать отчет')
+    run_parser.add_argument('--profile', choices=list(profiles), default='mixed')
+    run_parser.add_argument('--target', choices=['database', 'cluster'], default='database')
+    run_parser.add_argument('--threads', type=int, default=1)
+    run_parser.add_argument('--processes', type=int, default=0, help='Процессы, работающие через сервер')
+    run_parser.add_argument('--duration', type=float, default=10.0)
+    run_parser.add_argument('--keys', type=int, default=10000)
+    run_parser.add_argument('--databases', type=int, default=4, help='Количество баз данных кластера')
+    run_parser.add_argument('--ttl', type=float, default=1.0, help='TTL ключей профиля ttl')
+    run_parser.add_argument('--interval', type=float, default=1.0)
+    run_parser.add_argument('--folder', help='Папка для файлов баз данных')
+    run_parser.add_argument('--name')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='bench.json')
+
+    compare_parser = commands.add_parser('compare', help='Записать HTML-страницу сравнения отчетов')
+    compare_parser.add_argument('reports', nargs='+')
+    compare_parser.add_argument('--output', default='compare.html')
+
+    args = vars(parser.parse_args(argv))
+    command, output = args.pop('command'), args.pop('output')
+
+    if command == 'run':
+        report = run(**args)
+        summary = report['summary']
+
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+
+        print(f'{report["name"]}: {summary["throughput"]:,.0f} операций/с, '
+              f'p50 {summary["latency"]["p50"]:.3f} мс, p99 {summary["latency"]["p99"]:.3f} мс, p999 {summary["latency"]["p999"]:.3f} мс')
+    else:
+        reports = []
+
+        for path in args['reports']:
+            with open(path, encoding='utf-8') as file: reports.append(json.load(file))
+
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(compare(reports))
+
+    print(f'Отчет записан в {output}')
+
+if __name__ == '__main__':
+    main()
+
+__all__ = []
@@ -1,6 +1,6 @@
 from typing import Any
 from .errors import *
-from .tags import Tags, NewTag
+from .tags import Tags, NewTag, ForeignKeys
 
 class Check:
 
@@ -11,11 +11,8 @@ class Check:
 
     def is_key_exists(data: dict, key: str) -> None | bool:
 
-        try: 
-            data[key]
-            return True
-        except KeyError: 
-            raise KeyNotFound(f"Ключ '{key}' не найден")
+        if key in data: return True
+        raise KeyNotFound(f"Ключ '{key}' не найден")
         
     def is_number_float_or_int(number: int | float) -> None:
 
@@ -28,23 +25,30 @@ class Check:
             raise TypeError(f'Объекты типа {value.__class__.__name__} не поддерживаются для перевода в JSON')
         
     def can_key_be_added(data: dict, key: str) -> None | bool:
-        try: 
-            data[key]
-            raise KeyAddError(f"Ключ '{key}' yже существует. Для изменения ключа примените методы update или set")
-        except KeyError: return True
+
+        if key not in data: return True
+        raise KeyAddError(f"Ключ '{key}' yже существует. Для изменения ключа примените методы update или set")
+
+    @staticmethod
+    def is_schema_correct(self, key: str, value: Any) -> None:
+
+        for prefix, validator in self.schemas.items():
+            if key.startswith(prefix): validator(value)
         
     @staticmethod
-    def can_key_be_updated(self, key: str, value) -> None:
+    def can_key_be_updated(self, key: str, value, validate: bool = True) -> None:
 
         tags = Tags.get(self, key)
 
         result = value
             
-        for tag_name in list(tags.keys()):
-            for cls in NewTag.all:
-                if cls.__name__ == tag_name:
-                    if hasattr(cls, 'update'): 
-                        result = cls.update(self, key, self.data[key], result, tags[tag_name])
+        for tag_name, cls in Tags.pipeline(tuple(tags), ('update', 'update_many')):
+            if hasattr(cls, 'update'): result = cls.update(self, key, self.data[key], result, tags[tag_name])
+            else: result = cls.update_many(self, [key], [self.data[key]], [result], [tags[tag_name]])[0]
+
+        if validate: Check.is_schema_correct(self, key, result)
+
+        ForeignKeys.of(self).check_update(key, result)
 
         self.data[key] = result
 
@@ -1,4 +1,5 @@
-from .database import __version__, Database
+from .database import __version__, Database, dump_json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import os
 
 class Cluster:
@@ -19,7 +20,7 @@ class Cluster:
 
     В таком случае во всех задействованных базах атрибуту `autocommit` будет присвоено значение `True`
     
-    Это работает с атрибутами `autocommit, settings, encoding, indent, ensure_ascii`
+    Это работает с атрибутами `autocommit, settings, encoding, indent, ensure_ascii, key_index`
 
     `. . .`
 
@@ -67,6 +68,12 @@ class Cluster:
 
     Если создать ключи `autocommit, settings, encoding, indent, ensure_ascii`, то их значения будут использованы так-же, как если
     бы они были переданы в атрибутах класса `db`
+
+    `. . .`
+
+    Сохранить все измененные базы данных кластера можно методом `commit_all`
+
+    db.commit_all() >>> ['users']
     '''
 
     autocommit: bool = False
@@ -74,6 +81,7 @@ class Cluster:
     encoding: str = 'utf-8'
     indent: int = 4
     ensure_ascii: bool = False
+    key_index: bool = False
     databases: list
 
     def __init_subclass__(cls) -> None:
@@ -82,7 +90,7 @@ class Cluster:
 
         try:
 
-            clstr_db = Database(f'{cls.folder_path}\\cluster_settings.json')
+            clstr_db = Database(os.path.join(cls.folder_path, 'cluster_settings.json'))
 
             for key in clstr_db.keys():
                 if key == clstr_db.settings: continue
@@ -96,6 +104,7 @@ class Cluster:
         encoding = cls.encoding       
         indent = cls.indent
         ensure_ascii = cls.ensure_ascii
+        key_index = cls.key_index
 
         cls.databases = []
 
@@ -104,9 +113,69 @@ class Cluster:
             if file.split('.')[-1] != 'json': continue
 
             setattr(cls, file.split('.')[0], 
-                Database(f'{cls.folder_path}\\{file}', autocommit=autocommit,
-                            indent=indent, encoding=encoding, settings=settings, ensure_ascii=ensure_ascii))
+                Database(os.path.join(cls.folder_path, file), autocommit=autocommit,
+                            indent=indent, encoding=encoding, settings=settings, ensure_ascii=ensure_ascii, key_index=key_index))
             
             cls.databases.append(file.split('.')[0])
 
-__all__ = ['Cluster']
\ No newline at end of file
+    @classmethod
+    def commit_all(cls, workers: int | None = None, processes: bool = False, checkpoint: bool = False) -> list[str]:
+        '''
+        `Сохранить изменения всех баз данных кластера`
+
+        Сохраняются только базы данных с несохраненными изменениями. Запись выполняется параллельно
+
+        :param workers: Количество потоков или процессов. По умолчанию определяется пулом
+        :param processes: Если установлено значение True, то данные сериализуются в пуле процессов. 
+        Имеет смысл для больших баз данных, т. к. json с отступами сериализуется на чистом Python и не освобождает GIL
+        :param checkpoint: Если установлено значение True, то сохраняются все базы данных кластера. 
+        Сначала все данные записываются во временные файлы, и только если запись всех файлов прошла успешно, 
+        они заменяют файлы баз данных
+        :return: Имена сохраненных баз данных
+        '''
+
+        names = [name for name in cls.databases if checkpoint or getattr(cls, name).dirty]
+        if not names: return []
+
+        databases = [getattr(cls, name) for name in names]
+        suffix = '.tmp' if checkpoint else ''
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+        with pool(workers) as executor:
+
+            futures = [
+                executor.submit(dump_json, db.database_file + suffix, db.data, db.encoding, db.indent, db.ensure_ascii) 
+                for db in databases
+            ]
+
+        errors = [future.exception() for future in futures if future.exception() is not None]
+
+        if errors:
+            if checkpoint:
+                for db in databases:
+                    if os.path.exists(db.database_file + suffix): os.remove(db.database_file + suffix)
+            raise errors[0]
+
+        for db in databases:
+            if checkpoint: os.replace(db.database_file + suffix, db.database_file)
+            db.committed()
+
+        return names
+    
+    @classmethod
+    def snapshot(cls, folder_path: str) -> dict[str, int]:
+        '''
+        `Сохранить согласованные копии всех баз данных кластера в папку`
+
+        Копии создаются методом `Database.snapshot` из сохраненного состояния и не мешают записи в базы данных
+
+        :return: Словарь из пар Имя базы данных: Номер последнего изменения в копии
+        '''
+        os.makedirs(folder_path, exist_ok=True)
+
+        return {
+            name: getattr(cls, name).snapshot(os.path.join(folder_path, f'{name}.json'))
+            for name in cls.databases
+        }
+
+__all__ = ['Cluster']
@@ -0,0 +1,192 @@
+from array import array
+from typing import Any
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+operations = ('count', 'sum', 'min', 'max', 'avg', 'top')
+
+def extract(value: Any, parts: list[str]) -> Any:
+    '''`Получить вложенное значение по частям пути. None, если его нет`'''
+
+    for part in parts:
+        if isinstance(value, dict): value = value.get(part)
+        elif isinstance(value, list) and part.lstrip('-').isdigit() and -len(value) <= int(part) < len(value): value = value[int(part)]
+        else: return None
+
+    return value
+
+class Column:
+    '''
+    `Числовой столбец`
+
+    Хранит числа, найденные по пути `path` в значениях ключей с префиксом `prefix`, в непрерывном массиве `values`. 
+    Если указан `group_by`, то для каждого числа хранится также номер группы в массиве `codes`
+
+    Столбец обновляется при каждом изменении ключа, удаление выполняется перестановкой последнего элемента на место удаленного
+
+    Вычисления выполняются с помощью NumPy, если он установлен, иначе - циклами по массиву
+    '''
+
+    def __init__(self, path: str = '', group_by: str | None = None, prefix: str = ''):
+        '''
+        :param path: Путь к числу внутри значения через точку. Пустая строка - само значение
+        :param group_by: Путь к значению, по которому группируются числа
+        :param prefix: Префикс ключей
+        '''
+        self.path = path
+        self.group_by = group_by
+        self.prefix = prefix
+        self.parts = path.split('.') if path else []
+        self.group_parts = group_by.split('.') if group_by else None
+        self.clear()
+
+    def clear(self) -> None:
+        self.keys = []
+        self.positions = {}
+        self.values = array('d')
+        self.codes = array('q')
+        self.labels = []
+        self.label_codes = {}
+
+    def build(self, items) -> None:
+        '''`Заполнить столбец парами ключ-значение`'''
+        self.clear()
+        for key, value in items: self.set(key, value)
+
+    def set(self, key: str, value: Any) -> None:
+        '''`Записать число из значения ключа`'''
+
+        if not key.startswith(self.prefix): return
+
+        number = extract(value, self.parts)
+
+        if not isinstance(number, (int, float)) or isinstance(number, bool):
+            return self.remove(key)
+        
+        if self.group_parts is not None:
+            label = extract(value, self.group_parts)
+            if isinstance(label, (list, dict)): label = str(label)
+            if (code := self.label_codes.get(label)) is None:
+                code = self.label_codes[label] = len(self.labels)
+                self.labels.append(label)
+
+        position = self.positions.get(key)
+
+        if position is None:
+            self.positions[key] = len(self.keys)
+            self.keys.append(key)
+            self.values.append(number)
+            if self.group_parts is not None: self.codes.append(code)
+        else:
+            self.values[position] = number
+            if self.group_parts is not None: self.codes[position] = code
+    
+    def remove(self, key: str) -> None:
+        '''`Удалить ключ из столбца`'''
+
+        position = self.positions.pop(key, None)
+        if position is None: return
+
+        last = self.keys.pop()
+        value = self.values.pop()
+        code = self.codes.pop() if self.group_parts is not None else None
+
+        if last != key:
+            self.keys[position] = last
+            self.positions[last] = position
+            self.values[position] = value
+            if code is not None: self.codes[position] = code
+
+    def apply(self, event: str, key: str | None, value: Any) -> None:
+        '''`Обновить столбец по изменению базы данных`'''
+
+        match event:
+            case 'add' | 'update' | 'incr': self.set(key, value)
+            case 'delete' | 'expire' | 'evict': self.remove(key)
+            case 'drop': self.clear()
+
+    def aggregate(self, operation: str, k: int = 10) -> Any:
+        '''`Вычислить агрегат по всему столбцу`'''
+
+        if operation not in operations: raise ValueError(f'Неизвестная операция {operation}. Доступны: {", ".join(operations)}')
+
+        count = len(self.values)
+
+        if operation == 'count': return count
+        if operation == 'top': return self.top(k)
+        if count == 0: return 0 if operation == 'sum' else None
+
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)
+
+            match operation:
+                case 'sum': return float(values.sum())
+                case 'min': return float(values.min())
+                case 'max': return float(values.max())
+                case 'avg': return float(values.mean())
+
+        match operation:
+            case 'sum': return sum(self.values)
+            case 'min': return min(self.values)
+            case 'max': return max(self.values)
+            case 'avg': return sum(self.values) / count
+
+    def top(self, k: int) -> list[tuple[str, float]]:
+        '''`k ключей с наибольшими числами`'''
+
+        k = min(k, len(self.values))
+        if k <= 0: return []
+
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)
+            positions = numpy.argpartition(-values, k - 1)[:k]
+            positions = positions[numpy.argsort(-values[positions], kind='stable')]
+        else:
+            positions = sorted(range(len(self.values)), key=self.values.__getitem__, reverse=True)[:k]
+
+        return [(self.keys[position], self.values[position]) for position in positions]
+
+    def aggregate_groups(self, operation: str) -> dict[Any, Any]:
+        '''`Вычислить агрегат для каждой группы`'''
+
+        if operation not in operations or operation == 'top': 
+            raise ValueError(f'Операция {operation} не поддерживает группировку')
+
+        groups = len(self.labels)
+
+        if numpy is not None:
+            codes = numpy.frombuffer(self.codes, dtype=numpy.int64)
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)
+            counts = numpy.bincount(codes, minlength=groups)
+
+            match operation:
+                case 'count': result = counts
+                case 'sum': result = numpy.bincount(codes, weights=values, minlength=groups)
+                case 'avg': result = numpy.bincount(codes, weights=values, minlength=groups) / numpy.maximum(counts, 1)
+                case 'min' | 'max':
+                    result = numpy.full(groups, numpy.inf if operation == 'min' else -numpy.inf)
+                    getattr(numpy, 'minimum' if operation == 'min' else 'maximum').at(result, codes, values)
+
+            return {label: result[code].item() for code, label in enumerate(self.labels) if counts[code]}
+
+        counts = [0] * groups
+        results = [None] * groups
+
+        for code, value in zip(self.codes, self.values):
+            counts[code] += 1
+            current = results[code]
+
+            match operation:
+                case 'sum' | 'avg': results[code] = value if current is None else current + value
+                case 'min': results[code] = value if current is None or value < current else current
+                case 'max': results[code] = value if current is None or value > current else current
+
+        if operation == 'count': results = counts
+        if operation == 'avg': results = [None if result is None else result / count for result, count in zip(results, counts)]
+
+        return {label: results[code] for code, label in enumerate(self.labels) if counts[code]}
+
+__all__ = ['Column']
@@ -0,0 +1,153 @@
+import threading
+from .check import Check
+
+class Counters:
+    '''
+    `Быстрые счетчики`
+
+    Увеличения накапливаются в памяти отдельно для каждого потока и периодически переносятся в базу данных 
+    одним вызовом `Database.incr_many`. Поэтому частые `incr` не проверяют ключ в базе данных и не вызывают `autocommit`, 
+    а в журнал попадает одно изменение на ключ за перенос
+
+    Потоки накапливают увеличения независимо друг от друга. Перенос, в том числе периодический из отдельного потока, 
+    выполняется под блокировкой `Database.lock`, которую также берут `commit` и все изменяющие методы базы данных
+
+    >>> counters = Counters(db, interval=1)
+    >>> counters.incr('views')
+    >>> 101
+    >>> counters.incr_many({'views': 1, 'likes': 1})
+    >>> {'views': 102, 'likes': 16}
+
+    `Database.get` видит накопленные значения, а `Database.commit` переносит их перед сохранением. 
+    Отсутствующие ключи создаются со значением 0. Теги при увеличении не вызываются, как и в `Database.incr`
+    '''
+
+    def __init__(self, db, interval: float | None = None):
+        '''
+        :param db: База данных
+        :param interval: Период переноса в секундах. Если не указан, то перенос выполняется при `flush`, `get` и `commit`
+        '''
+        self.db = db
+        self.interval = interval
+        self.shards = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.timer = None
+
+        db.counters = self
+
+        if interval is not None: self.schedule()
+
+    def shard(self) -> tuple[threading.Lock, dict]:
+        '''`Накопленные увеличения текущего потока`'''
+
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = (threading.Lock(), {})
+            with self.lock: self.shards.append(shard)
+            return shard
+
+    def incr(self, key: str, number: int | float = 1) -> int | float:
+        '''
+        `Увеличить счетчик`
+
+        :return: Новое значение
+        '''
+        Check.is_key_string(key)
+        Check.is_number_float_or_int(number)
+
+        lock, deltas = self.shard()
+
+        with lock: deltas[key] = deltas.get(key, 0) + number
+
+        self.dirty = True
+
+        return self.value(key)
+    
+    def decr(self, key: str, number: int | float = 1) -> int | float:
+        '''
+        `Уменьшить счетчик`
+
+        :return: Новое значение
+        '''
+        return self.incr(key, -number)
+
+    def incr_many(self, numbers: dict[str, int | float]) -> dict[str, int | float]:
+        '''
+        `Увеличить несколько счетчиков`
+
+        :return: Словарь из пар Ключ: Новое значение
+        '''
+        for key, number in numbers.items():
+            Check.is_key_string(key)
+            Check.is_number_float_or_int(number)
+
+        lock, deltas = self.shard()
+
+        with lock:
+            for key, number in numbers.items(): deltas[key] = deltas.get(key, 0) + number
+
+        self.dirty = True
+
+        return {key: self.value(key) for key in numbers}
+    
+    def pending(self, key: str) -> int | float:
+        '''`Сумма еще не перенесенных увеличений ключа`'''
+        return sum(deltas.get(key, 0) for lock, deltas in self.shards)
+    
+    def value(self, key: str) -> int | float:
+        '''`Текущее значение счетчика без переноса в базу данных`'''
+        return self.db.data.get(key, 0) + self.pending(key)
+
+    def flush(self, commit: bool = True) -> dict[str, int | float]:
+        '''
+        `Перенести накопленные увеличения в базу данных`
+
+        :param commit: Если установлено значение False, то база данных не сохраняется даже при `autocommit`
+        :return: Словарь из пар Ключ: Новое значение
+        '''
+        self.dirty = False
+        merged = {}
+
+        with self.lock: shards = list(self.shards)
+
+        for lock, deltas in shards:
+            with lock:
+                items = list(deltas.items())
+                deltas.clear()
+
+            for key, number in items: merged[key] = merged.get(key, 0) + number
+
+        if not merged: return {}
+
+        with self.db.lock:
+            autocommit, self.db.autocommit = self.db.autocommit, self.db.autocommit and commit
+
+            try:
+                return self.db.incr_many(merged, create=True)
+            finally:
+                self.db.autocommit = autocommit
+
+    def schedule(self) -> None:
+        self.timer = threading.Timer(self.interval, self.run)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def run(self) -> None:
+        try: self.flush()
+        finally: 
+            if self.timer is not None: self.schedule()
+
+    def close(self) -> None:
+        '''`Остановить периодический перенос и перенести оставшиеся увеличения`'''
+
+        if self.timer is not None:
+            timer, self.timer = self.timer, None
+            timer.cancel()
+
+        self.flush()
+        self.db.counters = None
+
+__all__ = ['Counters']
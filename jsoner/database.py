@@ -1,10 +1,19 @@
 import json
+import copy
 from .check import Check
-from .tags import Tags, NewTag
+from .tags import Tags, NewTag, ForeignKeys
 from typing import Callable
 from .decorators import autocommit
+from .feed import ChangeFeed, append_events, last_seq
+from .schema import compile_schema
+from .index import KeyIndex
+from .columns import Column
+from . import transfer
+import time
+import os
+import threading
 from . import errors
-from typing import Any, TypeAlias
+from typing import Any, TypeAlias, IO
 
 __version__ = '0.1.3'
 
@@ -15,6 +24,23 @@ default_settings = {'__version__': __version__,
 
 JSONValue: TypeAlias = int | str | list | dict | float | tuple | None
 
+def dump_json(path: str, data: dict, encoding: str, indent: int, ensure_ascii: bool) -> None:
+    '''`Записать данные базы в файл`
+
+    Данные записываются во временный файл, который затем заменяет файл базы данных. 
+    Поэтому при чтении или копировании файла никогда не встретится наполовину записанный файл
+
+    Функция вынесена на уровень модуля, чтобы ее можно было выполнять в пуле процессов'''
+
+    try:
+        with open(path + '.tmp', 'w', encoding=encoding) as file: 
+            json.dump(data, file, indent=indent, ensure_ascii=ensure_ascii) 
+    except:
+        os.remove(path + '.tmp')
+        raise
+
+    os.replace(path + '.tmp', path)
+
 class Database:
     '''`Объект базы данных`'''
 
@@ -24,7 +50,9 @@ class Database:
                  indent: int = 4, 
                  encoding: str = 'utf-8',
                  ensure_ascii: bool = True,
-                 settings: str = '__settings__'):
+                 settings: str = '__settings__',
+                 journal: str | None = None,
+                 key_index: bool = False):
         '''
         
         `Объект базы данных`
@@ -39,29 +67,64 @@ class Database:
         :param indent: Сколько отступов будет в файле при переносе строки. Влияет только на внешний вид
         :param encoding: Кодировка файла. Рекомендуется 'utf-8'
         :param ensure_ascii: Если установлено значение True , в выводе будут экранированы все входящие символы, отличные от ASCII
-        :param settings: Зарезервированное имя для настроек, которое будет записано в файле'''
+        :param settings: Зарезервированное имя для настроек, которое будет записано в файле
+        :param journal: Путь к файлу журнала изменений. При каждом сохранении в него дописываются изменения, 
+        которые другие процессы могут читать с помощью `ChangeFeed`
+        :param key_index: Если установлено значение True, то поддерживается упорядоченный индекс ключей `index`, 
+        и методы `scan_prefix`, `range`, `count_prefix` и `delete_prefix` работают за O(log n + k)'''
         self.database_file = database_file
+        # изменяющие методы, commit и перенос счетчиков из других потоков выполняются под этой блокировкой
+        self.lock = threading.RLock()
         self.data = self.read_data()
+        self.dirty = False
         self.autocommit = autocommit
         self.indent = indent
         self.encoding = encoding
         self.settings = settings
         self.ensure_ascii = ensure_ascii
         self.cache = {}
+        self.schemas = {}
+        self.counters = None
+        self.foreign_keys = None
+        self.eviction = None
+        self.journal = journal
+        self.subscribers = []
+        self.pending = []
+        self.seq = self.journal_seq = last_seq(journal) if journal else 0
 
         try: 
             self.data[self.settings]
             if (db_version := self.data[self.settings]['__version__']) != __version__:
                 print(f"Текущая версия Jsoner {__version__} не совпадает с версией {db_version} базы данных {self.database_file}")
         except KeyError:
-            self.data[self.settings] = default_settings
+            self.data[self.settings] = copy.deepcopy(default_settings)
             self.commit()
 
+        self.index = KeyIndex() if key_index else None
+        self.columns = {}
+        self.reindex()
+
     def commit(self) -> None:
         """`Сохранить изменения в файл`"""
 
-        with open(self.database_file, 'w', encoding=self.encoding) as file: 
-            json.dump(self.data, file, indent=self.indent, ensure_ascii=self.ensure_ascii) 
+        with self.lock:
+            if self.counters is not None: self.counters.flush(commit=False)
+
+            dump_json(self.database_file, self.data, self.encoding, self.indent, self.ensure_ascii)
+            self.committed()
+
+    def committed(self) -> None:
+        '''
+        `Отметить данные сохраненными и дописать изменения в журнал`
+
+        Вызывается после успешной записи файла, в том числе из `Cluster.commit_all`
+        '''
+        self.dirty = False
+
+        if self.pending:
+            append_events(self.journal, self.pending, self.encoding)
+            self.journal_seq = self.pending[-1]['seq']
+            self.pending = []
     
     @autocommit
     def drop(self) -> None:
@@ -75,6 +138,7 @@ class Database:
             'global_tags': {}
             }
         }
+        self.notify('drop', None)
 
     def read_data(self) -> dict[str, JSONValue]:
         try:
@@ -91,7 +155,13 @@ class Database:
 
     def discard(self) -> None:
         '''`Отменить все несохраненные изменения`'''
-        self.data = self.read_data()
+
+        with self.lock:
+            self.data = self.read_data()
+            self.dirty = False
+            self.pending = []
+            self.seq = self.journal_seq
+            self.reindex()
         
     def get(self, key: str) -> JSONValue:
         """
@@ -100,52 +170,145 @@ class Database:
 
         Check.is_key_string(key)
 
+        if self.counters is not None and self.counters.dirty: self.counters.flush(commit=False)
+        if self.eviction is not None: self.eviction.touch(key)
+
         if key not in self.data: return self.data[self.settings]['default']
 
         tags = Tags.get(self, key)
-        
-        for tag_name in list(tags.keys()):
-
-            for cls in NewTag.all:
 
-                if cls.__name__ == tag_name:
-                    if hasattr(cls, 'read'): return cls.read(self, key, self.data[key], tags[tag_name])
+        if not tags: return self.data[key]
+        
+        for tag_name, cls in Tags.pipeline(tuple(tags), ('read', 'read_many')):
+            if hasattr(cls, 'read'): return cls.read(self, key, self.data[key], tags[tag_name])
+            return cls.read_many(self, [key], [self.data[key]], [tags[tag_name]])[0]
 
         return self.data[key]
         
     def get_many(self, keys: list[str]) -> list[JSONValue]:
-        '''`Получить значения по нескольким ключам`'''
-        return [self.get(key) for key in keys]
+        '''
+        `Получить значения по нескольким ключам`
+
+        Ключи с одинаковым набором тегов читаются группой: если у тега есть метод `read_many`, он вызывается один раз на группу
+        '''
+        for key in keys: Check.is_key_string(key)
+
+        if self.counters is not None and self.counters.dirty: self.counters.flush(commit=False)
+
+        if self.eviction is not None:
+            for key in keys: self.eviction.touch(key)
+
+        result = [self.data[self.settings]['default']] * len(keys)
+        groups = {}
+
+        for position, key in enumerate(keys):
+
+            if key not in self.data: continue
+
+            if tags := Tags.get(self, key): groups.setdefault(tuple(tags), []).append((position, key, tags))
+            else: result[position] = self.data[key]
+
+        for names, group in groups.items():
+
+            values = [self.data[key] for position, key, tags in group]
+
+            for tag_name, cls in Tags.pipeline(names, ('read', 'read_many')):
+                group_keys = [key for position, key, tags in group]
+                values = Tags.read(self, cls, group_keys, values, [tags[tag_name] for position, key, tags in group])
+                break
+
+            for (position, key, tags), value in zip(group, values): result[position] = value
+
+        return result
 
     @autocommit
-    def add(self, key: str, value: JSONValue, tags: dict = {}) -> None:
+    def add(self, key: str, value: JSONValue, tags: dict = {}, validate: bool = True) -> None:
         """
         `Добавление данных`
         
         :param key: Ключ должен быть объектом класса str
         :param value: Значение должно быть объектом стадартных классов 
         :param tags: Словарь должен состоять из пар Тег: Значение
+        :param validate: Если установлено значение False, то ключ и значение не проверяются, а существующий ключ 
+        перезаписывается. Подходит для загрузки заведомо корректных данных
         """
 
-        Check.is_key_string(key)
-        Check.is_value_correct(value)
-        Check.can_key_be_added(self.data, key)
+        if validate:
+            Check.is_key_string(key)
+            Check.is_value_correct(value)
+            Check.can_key_be_added(self.data, key)
+            Check.is_schema_correct(self, key, value)
 
         Tags.create(self, key, value, tags)
 
         self.data[key] = value
+        self.notify('add', key, value, tags=self.data[self.settings]['tags'].get(key))
 
     @autocommit
-    def update(self, key: str, value: JSONValue) -> None:
-        """`Изменение данных`"""
+    def update(self, key: str, value: JSONValue, validate: bool = True) -> None:
+        """
+        `Изменение данных`
+        
+        :param validate: Если установлено значение False, то значение не проверяется
+        """
+
+        if validate:
+            Check.is_key_string(key)
+            Check.is_value_correct(value)
+
+        if self.eviction is not None: self.eviction.touch(key)
 
-        Check.is_key_string(key)
         Check.is_key_exists(self.data, key)
-        Check.is_value_correct(value)
-        
-        Check.can_key_be_updated(self, key, value)
+        Check.can_key_be_updated(self, key, value, validate)
 
         # обновление в Check.can_key_be_updated
+        self.notify('update', key, self.data[key])
+
+    @autocommit
+    def update_many(self, values: dict[str, JSONValue], validate: bool = True) -> None:
+        """
+        `Изменение нескольких значений`
+
+        Ключи с одинаковым набором тегов обрабатываются группой: если у тега есть метод `update_many`, 
+        он вызывается один раз на группу. Данные изменяются, только если все значения прошли проверку тегов
+
+        :param values: Словарь из пар Ключ: Новое значение
+        :param validate: Если установлено значение False, то значения не проверяются
+        """
+
+        for key, value in values.items():
+            if validate:
+                Check.is_key_string(key)
+                Check.is_value_correct(value)
+            if self.eviction is not None: self.eviction.touch(key)
+            Check.is_key_exists(self.data, key)
+
+        groups = {}
+        for key in values: 
+            tags = Tags.get(self, key)
+            groups.setdefault(tuple(tags), []).append((key, tags))
+
+        result = {}
+
+        for names, group in groups.items():
+
+            keys = [key for key, tags in group]
+            new_values = [values[key] for key in keys]
+
+            for tag_name, cls in Tags.pipeline(names, ('update', 'update_many')):
+                old_values = [self.data[key] for key in keys]
+                new_values = Tags.update(self, cls, keys, old_values, new_values, [tags[tag_name] for key, tags in group])
+
+            result.update(zip(keys, new_values))
+
+        if validate:
+            for key, value in result.items(): Check.is_schema_correct(self, key, value)
+
+        for key, value in result.items(): ForeignKeys.of(self).check_update(key, value)
+
+        for key, value in result.items():
+            self.data[key] = value
+            self.notify('update', key, value)
 
     @autocommit
     def delete(self, key: str) -> None:
@@ -155,45 +318,105 @@ class Database:
 
         Check.is_key_string(key)
 
-        try: 
-            del self.data[key]
-            Tags.delete(self, key)
-        except: ...
+        if self.eviction is not None: self.eviction.touch(key)
+
+        if key not in self.data: return
+
+        ForeignKeys.of(self).check_delete(key)
+
+        del self.data[key]
+        Tags.delete(self, key)
+        self.notify('delete', key)
+
+    @autocommit
+    def expire(self, *keys: str) -> None:
+        """
+        `Удаление ключей, время жизни которых истекло`
+        """
 
-    def set(self, key: str, value: JSONValue, tags: dict = {}) -> None:
+        for key in keys:
+            if key in self.data:
+                del self.data[key]
+                Tags.delete(self, key)
+                self.notify('expire', key)
+
+    def set(self, key: str, value: JSONValue, tags: dict = {}, validate: bool = True) -> None:
         """`Установка значения`"""
 
         try: 
-            self.update(key, value)
+            self.update(key, value, validate)
         except errors.KeyNotFound: 
-            self.add(key, value, tags)
+            self.add(key, value, tags, validate)
 
     @autocommit
-    def incr(self, key: str, number: int | float = 1) -> None:
+    def incr(self, key: str, number: int | float = 1) -> int | float:
         """
         `Увеличить значение`
         
         :param number: Число, на которое увеличится значение
+        :return: Новое значение
         """
          
         Check.is_key_string(key)
+        if self.eviction is not None: self.eviction.touch(key)
         Check.is_key_exists(self.data, key)
         Check.is_number_float_or_int(number)
 
         self.data[key] += number
+        self.notify('incr', key, self.data[key], delta=number)
+
+        return self.data[key]
 
-    def decr(self, key: str, number: int | float = 1) -> None:
+    def decr(self, key: str, number: int | float = 1) -> int | float:
         """
         `Уменьшить значение`
         
         :param number: Число, на которое уменьшится значение
+        :return: Новое значение
         """
-        self.incr(key, -number)
+        return self.incr(key, -number)
+    
+    @autocommit
+    def incr_many(self, numbers: dict[str, int | float], create: bool = False) -> dict[str, int | float]:
+        """
+        `Увеличить несколько значений`
+
+        Все ключи и числа проверяются до изменения данных, а при `autocommit` база данных сохраняется один раз
+
+        >>> db.incr_many({'views': 1, 'likes': 5})
+        >>> {'views': 101, 'likes': 15}
+
+        :param numbers: Словарь из пар Ключ: Число
+        :param create: Если установлено значение True, то отсутствующие ключи создаются со значением 0
+        :return: Словарь из пар Ключ: Новое значение
+        """
+
+        for key, number in numbers.items():
+            Check.is_key_string(key)
+            if self.eviction is not None: self.eviction.touch(key)
+            if not create: Check.is_key_exists(self.data, key)
+            Check.is_number_float_or_int(number)
+
+        result = {}
+
+        for key, number in numbers.items():
+
+            if key in self.data: 
+                self.data[key] += number
+                self.notify('incr', key, self.data[key], delta=number)
+            else:
+                self.data[key] = number
+                self.notify('add', key, number, tags=None)
+
+            result[key] = self.data[key]
+
+        return result
 
     def keys(self) -> list[str]:
         '''`Все ключи`'''
         res = list(self.data.keys())
         res.remove(self.settings)
+        if self.eviction is not None: res.extend(self.eviction.cold)
         return res
 
     def values(self) -> list[JSONValue]:
@@ -202,8 +425,63 @@ class Database:
     
     def items(self) -> list[list[str, JSONValue]]:
         '''`Все пары ключ-значение`'''
-        return [(key, self.get(key)) for key in self.keys()]
+        keys = self.keys()
+        return list(zip(keys, self.get_many(keys)))
+    
+    def prefix_keys(self, prefix: str) -> list[str]:
+        '''`Отсортированные ключи с префиксом`'''
+        if self.index is not None: return self.index.prefix(prefix)
+        return sorted(key for key in self.keys() if key.startswith(prefix))
+
+    def scan_prefix(self, prefix: str) -> list[tuple[str, JSONValue]]:
+        '''
+        `Все пары ключ-значение с префиксом ключа`
+
+        >>> db.scan_prefix('user:1:')
+        >>> [('user:1:age', 30), ('user:1:name', 'Ann')]
+
+        :return: Список из пар ключ-значение, отсортированный по ключам
+        '''
+        keys = self.prefix_keys(prefix)
+        return list(zip(keys, self.get_many(keys)))
+    
+    def range(self, start: str | None = None, end: str | None = None) -> list[tuple[str, JSONValue]]:
+        '''
+        `Пары ключ-значение с ключами от start включительно до end не включительно`
+
+        :return: Список из пар ключ-значение, отсортированный по ключам
+        '''
+        if self.index is not None: keys = self.index.range(start, end)
+        else: keys = sorted(key for key in self.keys() if (start is None or key >= start) and (end is None or key < end))
+
+        return list(zip(keys, self.get_many(keys)))
     
+    def count_prefix(self, prefix: str) -> int:
+        '''`Количество ключей с префиксом`'''
+        if self.index is not None: return self.index.count_prefix(prefix)
+        return sum(1 for key in self.keys() if key.startswith(prefix))
+
+    @autocommit
+    def delete_prefix(self, prefix: str) -> int:
+        '''
+        `Удалить все ключи с префиксом`
+
+        :return: Количество удаленных ключей
+        '''
+        keys = self.prefix_keys(prefix)
+        deleted = set(keys)
+
+        for key in keys:
+            if referrers := ForeignKeys.of(self).referrers(key) - deleted:
+                raise errors.ForeignKeyError(f"На ключ '{key}' ссылаются ключи: {', '.join(sorted(referrers))}")
+
+        for key in keys:
+            del self.data[key]
+            Tags.delete(self, key)
+            self.notify('delete', key)
+
+        return len(keys)
+
     def __getitem__(self, key: str):
         return self.get(str(key))
     
@@ -219,6 +497,7 @@ class Database:
         '''
         if not isinstance(tag, str): tag = tag.__name__
         self.data[self.settings]['global_tags'][tag] = value
+        self.notify('global_tag', None, value, tag=tag)
 
     @autocommit
     def set_default(self, default_value: JSONValue) -> None:
@@ -226,6 +505,375 @@ class Database:
         `Устанавливает значение по умолчанию`
         '''
         self.data[self.settings]['default'] = default_value
+        self.notify('default', None, default_value)
+
+    def snapshot(self, path: str) -> int:
+        '''
+        `Сохранить согласованную копию базы данных`
+
+        Копируется сохраненное состояние базы данных - файл, записанный последним `commit`. Несохраненные изменения 
+        в копию не попадают, потому что они еще могут быть отменены `discard`. Файл базы данных заменяется атомарно, 
+        поэтому копия соответствует одному сохранению, и другие потоки могут продолжать изменять базу
+
+        В настройки копии записывается номер последнего сохраненного изменения `snapshot.seq`, чтобы `restore` мог продолжить 
+        с него восстановление по журналу. Копию можно открыть как обычную базу данных
+
+        :param path: Путь к файлу копии
+        :return: Номер последнего изменения в копии
+        '''
+        # номер читается до файла: если между ними пройдет commit, изменения применятся повторно, а не потеряются
+        seq = self.journal_seq
+
+        with open(self.database_file, 'r', encoding=self.encoding) as file:
+            data = json.load(file)
+
+        data[self.settings]['snapshot'] = {'seq': seq, 'time': time.time()}
+        dump_json(path, data, self.encoding, None, self.ensure_ascii)
+
+        return seq
+    
+    def backup(self, path: str, since: int = 0) -> int:
+        '''
+        `Инкрементальная резервная копия`
+
+        Дописывает в файл все сохраненные изменения журнала с номером больше `since`. 
+        Полученный файл имеет формат журнала и может быть передан в `restore`
+
+        >>> seq = db.snapshot('backup.json')
+        >>> seq = db.backup('backup.journal', since=seq)
+        >>> # позже
+        >>> seq = db.backup('backup.journal', since=seq)
+
+        :return: Номер последнего скопированного изменения. Его следует передать в `since` при следующем вызове
+        '''
+        if not self.journal: raise ValueError('Для инкрементальных копий база данных должна вести журнал (параметр journal)')
+
+        events = ChangeFeed(self.journal, self.encoding).read(since)
+        if events: append_events(path, events, self.encoding)
+
+        return events[-1]['seq'] if events else since
+    
+    @autocommit
+    def restore(self, path: str, at: float | None = None, journal: str | list[str] | None = None) -> None:
+        '''
+        `Восстановить базу данных из копии`
+
+        Загружает копию, созданную `snapshot`, и применяет к ней изменения из журнала, сделанные после копии
+
+        >>> db.restore('backup.json', at=time.time() - 3600)
+
+        :param path: Путь к файлу копии
+        :param at: Время (timestamp), на момент которого нужно восстановить данные. По умолчанию применяются все изменения
+        :param journal: Путь к журналу или список путей (например, инкрементальных копий). По умолчанию - журнал базы данных
+        '''
+        with open(path, 'r', encoding=self.encoding) as file:
+            data = json.load(file)
+
+        seq = data[self.settings].pop('snapshot', {'seq': 0})['seq']
+
+        if journal is None: journal = [self.journal] if self.journal else []
+        elif isinstance(journal, str): journal = [journal]
+
+        self.data = data
+        self.reindex()
+
+        for journal_path in journal:
+            for change in ChangeFeed(journal_path, self.encoding).read(seq):
+                if at is not None and change['time'] > at: break
+                self.apply(change)
+                seq = change['seq']
+
+        # восстановленные изменения уже есть в журнале
+        self.pending = []
+        self.seq = self.journal_seq
+
+    def apply(self, change: dict) -> None:
+        '''
+        `Применить изменение из журнала или подписки`
+
+        Изменение применяется напрямую к данным: теги не вызываются, а теги ключа берутся из изменения. 
+        Подписчики получают изменение так же, как при обычной записи
+        '''
+        key = change['key']
+        value = change['value']
+        settings = self.data[self.settings]
+
+        match change['event']:
+
+            case 'add':
+                self.data[key] = value
+                if change.get('tags') is not None: settings['tags'][key] = change['tags']
+                else: settings['tags'].pop(key, None)
+
+            case 'update' | 'incr':
+                self.data[key] = value
+
+            case 'delete' | 'expire':
+                self.data.pop(key, None)
+                settings['tags'].pop(key, None)
+
+            case 'evict' if not change.get('spilled'):
+                # вытесненный без файла ключ удален из исходной базы данных
+                self.data.pop(key, None)
+                settings['tags'].pop(key, None)
+
+            case 'drop':
+                self.data = {self.settings: copy.deepcopy(default_settings)}
+
+            case 'global_tag':
+                settings['global_tags'][change['tag']] = value
+
+            case 'default':
+                settings['default'] = value
+
+            case 'evict':
+                # вытесненный в файл ключ остается в исходной базе данных
+                return
+
+        extra = {name: item for name, item in change.items() if name not in ('seq', 'time', 'event', 'key', 'value')}
+        self.notify(change['event'], key, value, **extra)
+
+    def reindex(self) -> None:
+        '''`Перестроить индекс ключей и столбцы после замены всех данных`'''
+
+        if self.index is not None: self.index = KeyIndex(self.keys())
+        self.columns = {}
+        self.foreign_keys = None
+        if self.eviction is not None: self.eviction.reset()
+
+    def column(self, path: str = '', group_by: str | None = None, prefix: str = '') -> Column:
+        '''
+        `Числовой столбец для аналитических запросов`
+
+        Столбец создается при первом обращении и затем обновляется при каждом изменении данных
+        '''
+        if (column := self.columns.get((path, group_by, prefix))) is None:
+            column = Column(path, group_by, prefix)
+            column.build((key, self.data[key]) for key in self.keys())
+            self.columns[(path, group_by, prefix)] = column
+
+        return column
+
+    def aggregate(self, operation: str, path: str = '', group_by: str | None = None, prefix: str = '', k: int = 10) -> Any:
+        '''
+        `Аналитический запрос по числовым значениям`
+
+        Числа хранятся в столбцах - непрерывных массивах, которые строятся при первом запросе и обновляются при изменениях, 
+        поэтому повторные запросы не просматривают данные. Если установлен NumPy, вычисления векторизуются
+
+        Учитываются только числа (int и float). Запрос читает данные напрямую, теги (например, TTL) не вызываются
+
+        >>> db.aggregate('avg', 'age', prefix='user:')
+        >>> 32.5
+        >>> db.aggregate('count', 'age', group_by='job')
+        >>> {'Data Analyst': 1, 'Team Lead': 1}
+        >>> db.aggregate('top', 'age', k=1)
+        >>> [('John', 35.0)]
+
+        :param operation: `count`, `sum`, `min`, `max`, `avg` или `top`
+        :param path: Путь к числу внутри значения через точку. По умолчанию - само значение
+        :param group_by: Путь к значению, по которому группируются числа
+        :param prefix: Учитывать только ключи с этим префиксом
+        :param k: Количество ключей для операции `top`
+        :return: Число, словарь из пар Группа: Число при группировке или список пар ключ-число для `top`
+        '''
+        column = self.column(path, group_by, prefix)
+
+        if group_by is None: return column.aggregate(operation, k)
+        return column.aggregate_groups(operation)
+
+    def load(self, records: list[tuple[str, JSONValue, dict | None]], validate: bool = True) -> None:
+        '''
+        `Записать пачку данных`
+
+        Существующие ключи перезаписываются. Теги записываются как есть, без вызова `create`, поэтому, например, 
+        TTL сохраняет время окончания из экспорта. База данных не сохраняется - это делают вызывающие методы
+
+        :param records: Список из записей (ключ, значение, теги). Теги могут быть None
+        :param validate: Проверять ключи и значения
+        '''
+        tags = self.data[self.settings]['tags']
+
+        # индекс обновляется один раз на пачку, а не по одному ключу
+        index, self.index = self.index, None
+        keys = []
+
+        try:
+            for key, value, key_tags in records:
+
+                if validate:
+                    Check.is_key_string(key)
+                    Check.is_value_correct(value)
+                    Check.is_schema_correct(self, key, value)
+
+                self.data[key] = value
+                keys.append(key)
+
+                if key_tags: tags[key] = key_tags
+                else: tags.pop(key, None)
+
+                self.notify('add', key, value, tags=key_tags or None)
+        finally:
+            if index is not None: index.update(keys)
+            self.index = index
+
+    @autocommit
+    def import_ndjson(self, path_or_stream: str | IO, batch_size: int = 10000, 
+                      workers: int | None = None, validate: bool = True) -> int:
+        '''
+        `Импорт из NDJSON`
+
+        Каждая строка - объект `{"key": ..., "value": ..., "tags": {...}}`, ключ `tags` необязателен. 
+        Файл читается пачками по `batch_size` строк, поэтому память не зависит от размера файла
+
+        >>> db.import_ndjson('data.ndjson', workers=4)
+        >>> 1000000
+
+        :param path_or_stream: Путь к файлу или текстовый поток
+        :param workers: Количество процессов для разбора строк. Полезно для файлов в несколько гигабайт
+        :param validate: Проверять ключи и значения
+        :return: Количество импортированных ключей
+        '''
+        count = 0
+
+        with transfer.opened(path_or_stream, 'r', self.encoding) as stream:
+            for records in transfer.read_ndjson(stream, batch_size, workers):
+                self.load(records, validate)
+                count += len(records)
+
+        return count
+    
+    def export_ndjson(self, path_or_stream: str | IO, prefix: str | None = None) -> int:
+        '''
+        `Экспорт в NDJSON`
+
+        Значения записываются как есть, вместе с тегами, поэтому после `import_ndjson` данные и теги будут теми же
+
+        :param path_or_stream: Путь к файлу или текстовый поток
+        :param prefix: Экспортировать только ключи с префиксом
+        :return: Количество экспортированных ключей
+        '''
+        tags = self.data[self.settings]['tags']
+        keys = self.keys() if prefix is None else self.prefix_keys(prefix)
+
+        with transfer.opened(path_or_stream, 'w', self.encoding) as stream:
+            for key in keys: stream.write(transfer.ndjson_line(key, self.data[key], tags.get(key)))
+
+        return len(keys)
+    
+    @autocommit
+    def import_csv(self, path_or_stream: str | IO, batch_size: int = 10000, validate: bool = True) -> int:
+        '''
+        `Импорт пар ключ-значение из CSV`
+
+        Файл из двух столбцов `key` и `value`. Числа, `true`, `false` и `null` преобразуются, остальное остается строками
+
+        :return: Количество импортированных ключей
+        '''
+        count = 0
+
+        with transfer.opened(path_or_stream, 'r', self.encoding) as stream:
+            for records in transfer.read_csv(stream, batch_size):
+                self.load(records, validate)
+                count += len(records)
+
+        return count
+    
+    def export_csv(self, path_or_stream: str | IO, prefix: str | None = None) -> int:
+        '''
+        `Экспорт пар ключ-значение в CSV`
+
+        Поддерживаются только простые значения: строки, числа, True, False и None. Теги не экспортируются
+
+        :return: Количество экспортированных ключей
+        '''
+        keys = self.keys() if prefix is None else self.prefix_keys(prefix)
+
+        with transfer.opened(path_or_stream, 'w', self.encoding) as stream:
+            transfer.write_csv(stream, ((key, self.data[key]) for key in keys))
+
+        return len(keys)
+
+    def check_foreign_keys(self) -> list[tuple[str, JSONValue, str]]:
+        '''
+        `Проверка целостности внешних ключей`
+
+        >>> db.check_foreign_keys()
+        >>> [('user1', 'guest', 'user_roles')]
+
+        :return: Список из (ключ, значение, ключ списка) для значений, которых нет в списке, или списков, которых нет
+        '''
+        return ForeignKeys.of(self).check()
+
+    def set_schema(self, prefix: str, schema: Any) -> None:
+        '''
+        `Установить схему для ключей с префиксом`
+
+        Схема преобразуется в функцию проверки один раз. При добавлении и изменении ключей с этим префиксом значения 
+        проверяются вместе со всеми вложенными значениями. Описание схем в `jsoner.schema.compile_schema`
+
+        Схемы не сохраняются в файл, их следует устанавливать после создания объекта базы данных
+
+        >>> db.set_schema('user:', {'name': str, 'age?': int})
+        >>> db.add('user:1', {'name': 'Ann', 'age': '30'})
+        >>> raise SchemaError
+
+        Удалить схему можно так: `del db.schemas[prefix]`
+        '''
+        self.schemas[prefix] = compile_schema(schema)
+
+    def subscribe(self, target: str | Callable, callback: Callable) -> tuple:
+        '''
+        `Подписаться на изменения`
+
+        Функция `callback` вызывается сразу после изменения с одним аргументом - словарем изменения
+
+        >>> db.subscribe('user:', lambda event: print(event))
+        >>> db.add('user:1', 'Ann')
+        >>> {'seq': 1, 'time': 1700000000.0, 'event': 'add', 'key': 'user:1', 'value': 'Ann', 'tags': None}
+
+        Виды изменений: `add`, `update`, `delete`, `incr`, `expire`, `evict`, а также `drop`, `global_tag` и `default`, 
+        у которых ключ равен None
+
+        :param target: Префикс ключей или функция, которая принимает ключ и возвращает True для нужных ключей
+        :return: Подписка, которую можно передать в `unsubscribe`
+        '''
+        subscription = (target, callback)
+        self.subscribers.append(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: tuple) -> None:
+        '''`Отменить подписку`'''
+        self.subscribers.remove(subscription)
+
+    def notify(self, event: str, key: str | None, value: JSONValue = None, **extra) -> None:
+        '''`Оповестить индексы, подписчиков и журнал об изменении`'''
+
+        if self.index is not None:
+            match event:
+                case 'add': self.index.add(key)
+                case 'delete' | 'expire': self.index.remove(key)
+                case 'evict' if not extra.get('spilled'): self.index.remove(key)
+                case 'drop': self.index = KeyIndex()
+
+        for column in self.columns.values(): column.apply(event, key, value)
+
+        if self.foreign_keys is not None: self.foreign_keys.apply(event, key, extra)
+
+        if self.subscribers or self.journal:
+
+            self.seq += 1
+            change = {'seq': self.seq, 'time': time.time(), 'event': event, 'key': key, 'value': value, **extra}
+
+            if self.journal: self.pending.append(change)
+
+            for target, callback in list(self.subscribers):
+
+                if key is None or (key.startswith(target) if isinstance(target, str) else target(key)):
+                    callback(change)
+
+        # вытеснение может вызвать notify, поэтому выполняется после оповещения о текущем изменении
+        if self.eviction is not None: self.eviction.apply(event, key, value)
 
     def __enter__(self):
         self.cache['autocommit'], self.autocommit = self.autocommit, False
@@ -240,7 +888,7 @@ class Database:
         return str(self.data)
     
     def __contains__(self, key: str) -> bool:
-        return key in self.data
+        return key in self.data or (self.eviction is not None and key in self.eviction.cold)
     
     def find_all(self, func: Callable) -> list[tuple[str, JSONValue]]:
         '''
@@ -253,8 +901,10 @@ class Database:
         '''
         data = self.data.copy()
         data.pop(self.settings)
+
+        keys = [key for key, value in data.items() if func(value)]
     
-        return [(key, self.get(key)) for key, value in list(data.items()) if func(value)]
+        return list(zip(keys, self.get_many(keys)))
     
     def find_one(self, func: Callable) -> tuple[str, JSONValue] | None:
         '''
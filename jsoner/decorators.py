@@ -2,10 +2,15 @@ def autocommit(func):
 
     def wrapper(*args, **kwargs):
 
-        result = func(*args, **kwargs)
+        with args[0].lock:
+            result = func(*args, **kwargs)
 
-        if args[0].autocommit: args[0].commit()
+            args[0].dirty = True
+            if args[0].autocommit: args[0].commit()
 
         return result
 
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+
     return wrapper
@@ -5,4 +5,5 @@ class UnkownTag(Exception): ...
 class ValueIsConstant(Exception): ...
 class ForeignKeyError(Exception): ...
 class UniqueValueError(Exception): ...
-class UpdateDenied(Exception): ...
\ No newline at end of file
+class UpdateDenied(Exception): ...
+class SchemaError(TypeError): ...
\ No newline at end of file
@@ -0,0 +1,228 @@
+import json
+import os
+import random
+from itertools import count
+from .tags import Tags
+
+policies = ('lru', 'lfu', 'ttl')
+
+class Eviction:
+    '''
+    `Ограничение памяти базы данных`
+
+    Когда количество ключей превышает `max_keys` или примерный размер значений превышает `max_memory`, ключи вытесняются 
+    из памяти. Какой ключ вытеснить, выбирается приближенно, как в Redis: из `samples` случайных ключей выбирается худший 
+    по политике:
+
+    `lru` - к которому дольше всего не обращались
+
+    `lfu` - к которому обращались реже всего
+
+    `ttl` - у которого раньше всего истекает TTL, а если у ключей нет TTL, то как в `lru`
+
+    Если указан файл `spill`, то вытесненные значения дописываются в него и загружаются обратно при обращении 
+    к ключу (`get`, `update`, `incr`, `delete`), а теги ключа сохраняются. Иначе вытесненные ключи удаляются
+
+    >>> Eviction(db, max_keys=10000, policy='lru', spill='data.cold')
+
+    Вытеснение отправляет подписчикам изменение `evict`. Аналитические запросы `aggregate` учитывают только ключи в памяти
+    '''
+
+    def __init__(self, db, max_keys: int | None = None, max_memory: int | None = None, policy: str = 'lru', 
+                 spill: str | None = None, samples: int = 5):
+        '''
+        :param db: База данных
+        :param max_keys: Максимальное количество ключей в памяти
+        :param max_memory: Максимальный размер значений в памяти в байтах (размер значения в JSON)
+        :param policy: Политика вытеснения: `lru`, `lfu` или `ttl`
+        :param spill: Путь к файлу для вытесненных значений. Если не указан, вытесненные ключи удаляются
+        :param samples: Сколько случайных ключей сравнивать при выборе
+        '''
+        if policy not in policies: raise ValueError(f'Неизвестная политика {policy}. Доступны: {", ".join(policies)}')
+
+        self.db = db
+        self.max_keys = max_keys
+        self.max_memory = max_memory
+        self.policy = policy
+        self.spill = spill
+        self.samples = samples
+        self.ticks = count()
+        self.evicting = False
+
+        db.eviction = self
+        self.reset()
+
+    def reset(self) -> None:
+        '''`Заново учесть все ключи базы данных`'''
+
+        self.keys = []
+        self.positions = {}
+        self.access = {}
+        self.sizes = {}
+        self.memory = 0
+
+        for key in self.db.data:
+            if key != self.db.settings: self.track(key, self.db.data[key])
+
+        self.enforce()
+
+    @property
+    def cold(self) -> dict[str, list[int]]:
+        '''`Вытесненные в файл ключи: смещение и длина значения в файле`'''
+        return self.db.data[self.db.settings].setdefault('cold', {}) if self.spill else {}
+
+    def track(self, key: str, value) -> None:
+        '''`Учесть ключ в памяти`'''
+
+        if key not in self.positions:
+            self.positions[key] = len(self.keys)
+            self.keys.append(key)
+            self.access[key] = 0 if self.policy == 'lfu' else next(self.ticks)
+
+        if self.max_memory is not None:
+            size = len(json.dumps(value, ensure_ascii=False))
+            self.memory += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+
+    def untrack(self, key: str) -> None:
+        '''`Перестать учитывать ключ`'''
+
+        position = self.positions.pop(key, None)
+        if position is None: return
+
+        last = self.keys.pop()
+        if last != key:
+            self.keys[position] = last
+            self.positions[last] = position
+
+        del self.access[key]
+        self.memory -= self.sizes.pop(key, 0)
+
+    def touch(self, key: str) -> None:
+        '''`Отметить обращение к ключу, загрузив его из файла, если он вытеснен`'''
+
+        if key in self.access:
+            if self.policy == 'lfu': self.access[key] += 1
+            else: self.access[key] = next(self.ticks)
+
+        elif key not in self.db.data and key in self.cold:
+            self.load(key)
+
+    def over(self) -> bool:
+        '''`Превышен ли лимит`'''
+
+        if self.max_keys is not None and len(self.keys) > self.max_keys: return True
+        if self.max_memory is not None and self.memory > self.max_memory: return True
+        return False
+
+    def score(self, key: str):
+        '''`Чем меньше, тем раньше ключ будет вытеснен`'''
+
+        if self.policy == 'ttl':
+            ttl = Tags.get(self.db, key).get('ttl')
+            return (0, ttl) if ttl is not None else (1, self.access[key])
+
+        return self.access[key]
+
+    def candidate(self, keep: str | None = None) -> str:
+        '''
+        `Ключ для вытеснения из случайной выборки`
+
+        :param keep: Ключ, который вытесняется последним (только что добавленный или загруженный)
+        '''
+        keys = [key for key in random.sample(self.keys, min(self.samples + 1, len(self.keys))) if key != keep]
+        sample = keys[:self.samples] or [keep]
+
+        if self.db.foreign_keys is not None:
+            sample = [key for key in sample if not self.db.foreign_keys.referrers(key)] or sample
+
+        return min(sample, key=self.score)
+
+    def enforce(self, keep: str | None = None) -> None:
+        '''
+        `Вытеснять ключи, пока лимит превышен`
+
+        :param keep: Ключ, который вытесняется последним
+        '''
+
+        if self.evicting: return
+        self.evicting = True
+
+        try:
+            while self.over() and self.keys: self.evict(self.candidate(keep))
+        finally:
+            self.evicting = False
+
+    def evict(self, key: str) -> None:
+        '''`Вытеснить ключ`'''
+
+        value = self.db.data.pop(key)
+        self.untrack(key)
+
+        if self.spill:
+            line = (json.dumps(value, ensure_ascii=False) + '\n').encode()
+
+            with open(self.spill, 'ab') as file:
+                offset = file.seek(0, os.SEEK_END)
+                file.write(line)
+
+            self.cold[key] = [offset, len(line)]
+        else:
+            Tags.delete(self.db, key)
+
+        self.db.dirty = True
+        self.db.notify('evict', key, spilled=bool(self.spill))
+
+    def load(self, key: str) -> None:
+        '''`Загрузить вытесненный ключ из файла`'''
+
+        offset, length = self.cold.pop(key)
+
+        with open(self.spill, 'rb') as file:
+            file.seek(offset)
+            value = json.loads(file.read(length))
+
+        self.db.data[key] = value
+        self.db.dirty = True
+        self.track(key, value)
+
+        for column in self.db.columns.values(): column.set(key, value)
+
+        self.enforce(key)
+
+    def compact(self) -> None:
+        '''`Переписать файл вытесненных значений без удаленных и загруженных обратно`'''
+
+        if not self.spill or not os.path.exists(self.spill): return
+
+        cold = {}
+
+        with open(self.spill, 'rb') as source, open(self.spill + '.tmp', 'wb') as target:
+            for key, (offset, length) in self.cold.items():
+                source.seek(offset)
+                cold[key] = [target.tell(), length]
+                target.write(source.read(length))
+
+        os.replace(self.spill + '.tmp', self.spill)
+        self.db.data[self.db.settings]['cold'] = cold
+        self.db.dirty = True
+
+    def apply(self, event: str, key: str | None, value) -> None:
+        '''`Обновить учет по изменению базы данных`'''
+
+        match event:
+            case 'add' | 'update' | 'incr':
+                if key in self.db.data:
+                    self.cold.pop(key, None)
+                    self.track(key, value)
+                    self.enforce(key)
+            case 'delete' | 'expire':
+                self.untrack(key)
+                self.cold.pop(key, None)
+            case 'evict' if key not in self.db.data and key not in self.cold:
+                # изменение из другой базы данных через apply
+                self.untrack(key)
+            case 'drop':
+                self.reset()
+
+__all__ = ['Eviction']
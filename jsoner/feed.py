@@ -0,0 +1,94 @@
+import json
+
+class ChangeFeed:
+    '''
+    `Журнал изменений`
+
+    Читает журнал, который ведет база данных с параметром `journal`. Каждое изменение записано отдельной строкой JSON 
+    и имеет порядковый номер `seq`
+
+    >>> feed = ChangeFeed('data.journal')
+    >>> feed.read()
+    >>> [{'seq': 1, 'time': 1700000000.0, 'event': 'add', 'key': 'key', 'value': 'value'}]
+
+    Повторный вызов `read` возвращает только новые изменения и не перечитывает файл с начала
+    '''
+
+    def __init__(self, path: str, encoding: str = 'utf-8'):
+        '''
+        :param path: Путь к файлу журнала
+        :param encoding: Кодировка файла
+        '''
+        self.path = path
+        self.encoding = encoding
+        self.position = 0
+        self.seq = 0
+
+    def read(self, since: int | None = None) -> list[dict]:
+        '''
+        `Прочитать изменения`
+
+        :param since: Номер изменения, после которого нужно читать. По умолчанию - последний прочитанный номер
+        :return: Список изменений с номером больше `since`
+        '''
+        if since is None: since = self.seq
+        if since < self.seq: self.position = 0
+
+        try:
+            with open(self.path, 'rb') as file:
+                file.seek(self.position)
+                chunk = file.read()
+        except FileNotFoundError:
+            return []
+
+        # недописанная строка будет прочитана при следующем вызове
+        end = chunk.rfind(b'\n') + 1
+        self.position += end
+
+        events = []
+
+        for line in chunk[:end].splitlines():
+            if not line: continue
+            event = json.loads(line.decode(self.encoding))
+            self.seq = event['seq']
+            if event['seq'] > since: events.append(event)
+
+        return events
+    
+    def __iter__(self):
+        return iter(self.read(0))
+
+def append_events(path: str, events: list[dict], encoding: str = 'utf-8') -> None:
+    '''`Дописать изменения в журнал`'''
+
+    lines = ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events)
+
+    with open(path, 'a', encoding=encoding) as file:
+        file.write(lines)
+
+def last_seq(path: str) -> int:
+    '''`Номер последнего изменения в журнале`'''
+
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return 0
+
+    with file:
+        position = file.seek(0, 2)
+        chunk = b''
+
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            file.seek(position)
+            chunk = file.read(step) + chunk
+
+            lines = chunk.rstrip(b'\n').split(b'\n')
+
+            if len(lines) > 1 or position == 0:
+                return json.loads(lines[-1])['seq'] if lines[-1] else 0
+
+    return 0
+
+__all__ = ['ChangeFeed']
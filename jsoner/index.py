@@ -0,0 +1,146 @@
+import heapq
+from bisect import bisect_left
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+# ключи хранятся блоками до 2 * load ключей, поэтому вставка и удаление сдвигают не больше одного блока
+load = 1000
+
+class KeyIndex:
+    '''
+    `Упорядоченный индекс ключей`
+
+    Хранит ключи в отсортированных блоках ограниченного размера, как `SortedList`. Блок ключа находится двоичным поиском 
+    по последним ключам блоков, поэтому добавление и удаление выполняются за O(log n + load), а поиск по префиксу 
+    и диапазону - за O(log n + k)
+
+    >>> index = KeyIndex(['user:1:name', 'user:2:name', 'post:1'])
+    >>> index.prefix('user:')
+    >>> ['user:1:name', 'user:2:name']
+    '''
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.build(sorted(keys))
+
+    def build(self, keys: list[str]) -> None:
+        '''`Заменить содержимое индекса отсортированными ключами без повторов`'''
+        self.blocks = [keys[start:start + load] for start in range(0, len(keys), load)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(keys)
+
+    def add(self, key: str) -> None:
+        '''`Добавить ключ. Повторное добавление ничего не меняет`'''
+
+        if not self.blocks:
+            self.build([key])
+            return
+
+        block = min(bisect_left(self.maxes, key), len(self.blocks) - 1)
+        keys = self.blocks[block]
+        position = bisect_left(keys, key)
+
+        if position < len(keys) and keys[position] == key: return
+
+        keys.insert(position, key)
+        self.maxes[block] = keys[-1]
+        self.size += 1
+
+        if len(keys) > 2 * load:
+            self.blocks[block:block + 1] = [keys[:load], keys[load:]]
+            self.maxes[block:block + 1] = [keys[load - 1], keys[-1]]
+
+    def update(self, keys: Iterable[str]) -> None:
+        '''`Добавить несколько ключей. Большая пачка сливается с индексом за один проход`'''
+
+        keys = sorted(keys)
+
+        if len(keys) * 8 < self.size:
+            for key in keys: self.add(key)
+            return
+
+        merged = []
+        for key in heapq.merge(self, keys):
+            if not merged or merged[-1] != key: merged.append(key)
+
+        self.build(merged)
+
+    def remove(self, key: str) -> None:
+        '''`Удалить ключ, если он есть`'''
+
+        block, position = self.locate(key)
+        if block == len(self.blocks) or self.blocks[block][position] != key: return
+
+        keys = self.blocks[block]
+        del keys[position]
+        self.size -= 1
+
+        if keys: 
+            self.maxes[block] = keys[-1]
+        else:
+            del self.blocks[block]
+            del self.maxes[block]
+
+    def locate(self, key: str) -> tuple[int, int]:
+        '''`Блок и позиция в блоке первого ключа, который не меньше key`'''
+
+        block = bisect_left(self.maxes, key)
+        if block == len(self.blocks): return block, 0
+        return block, bisect_left(self.blocks[block], key)
+
+    def between(self, start: str | None, end: str | None) -> Iterator[str]:
+        '''`Ключи от start включительно до end не включительно`'''
+
+        first, position = (0, 0) if start is None else self.locate(start)
+        last, last_position = (len(self.blocks), 0) if end is None else self.locate(end)
+
+        if first == last: return iter(self.blocks[first][position:last_position] if first < len(self.blocks) else ())
+
+        return chain(
+            islice(self.blocks[first], position, None), 
+            chain.from_iterable(self.blocks[first + 1:last]),
+            self.blocks[last][:last_position] if last < len(self.blocks) else ()
+        )
+
+    def count(self, start: str | None, end: str | None) -> int:
+        '''`Количество ключей от start включительно до end не включительно`'''
+
+        first, position = (0, 0) if start is None else self.locate(start)
+        last, last_position = (len(self.blocks), 0) if end is None else self.locate(end)
+
+        if first == last: return last_position - position
+        return sum(map(len, self.blocks[first:last])) - position + last_position
+
+    def prefix(self, prefix: str) -> list[str]:
+        '''`Ключи с префиксом`'''
+        return list(self.between(prefix, prefix_upper_bound(prefix)))
+    
+    def count_prefix(self, prefix: str) -> int:
+        '''`Количество ключей с префиксом`'''
+        return self.count(prefix, prefix_upper_bound(prefix))
+
+    def range(self, start: str | None = None, end: str | None = None) -> list[str]:
+        '''`Ключи от start включительно до end не включительно`'''
+        if start is not None and end is not None and end <= start: return []
+        return list(self.between(start, end))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return chain.from_iterable(self.blocks)
+    
+    def __contains__(self, key: str) -> bool:
+        block, position = self.locate(key)
+        return block < len(self.blocks) and self.blocks[block][position] == key
+
+def prefix_upper_bound(prefix: str) -> str | None:
+    '''`Наименьшая строка, которая больше всех строк с префиксом. None, если такой строки нет`'''
+
+    while prefix:
+        if (code := ord(prefix[-1])) < 0x10FFFF:
+            return prefix[:-1] + chr(code + 1)
+        prefix = prefix[:-1]
+
+    return None
+
+__all__ = ['KeyIndex']
@@ -0,0 +1,298 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from .database import Database
+
+class Handler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+
+        line = self.rfile.readline()
+        if not line: return
+
+        primary = self.server.primary
+        lines = primary.attach(json.loads(line))
+
+        try:
+            while not primary.closed:
+                try: item = lines.get(timeout=primary.heartbeat)
+                except queue.Empty: item = primary.beat()
+
+                if item is None: break
+                self.wfile.write(item)
+        except OSError:
+            ...
+        finally:
+            primary.detach(lines)
+
+class Primary:
+    '''
+    `Источник репликации`
+
+    Отправляет изменения базы данных репликам `Replica` через TCP или Unix-сокет. Каждое изменение - строка JSON
+    с номером `seq`, как в журнале изменений
+
+    Подключившаяся реплика сообщает номер последнего полученного изменения. Если недостающие изменения еще есть
+    в памяти источника (последние `backlog` изменений), реплика получает только их, иначе - копию данных и затем изменения
+
+    >>> db = Database('data.json', autocommit=True)
+    >>> primary = Primary(db, ('127.0.0.1', 8766)).start()
+    '''
+
+    def __init__(self, db: Database, address: tuple[str, int] | str, backlog: int = 100000, heartbeat: float = 1.0):
+        '''
+        :param db: База данных
+        :param address: Пара (хост, порт) для TCP или путь к Unix-сокету
+        :param backlog: Сколько последних изменений хранить для догоняющих реплик
+        :param heartbeat: Как часто в секундах отправлять репликам номер последнего изменения, если изменений нет
+        '''
+        self.db = db
+        self.id = uuid.uuid4().hex
+        self.backlog = deque(maxlen=backlog)
+        self.heartbeat = heartbeat
+        self.replicas = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+        self.subscription = db.subscribe('', self.publish)
+
+        if isinstance(address, str):
+            if os.path.exists(address): os.remove(address)
+            server_class = socketserver.ThreadingUnixStreamServer
+        else:
+            server_class = socketserver.ThreadingTCPServer
+            server_class.allow_reuse_address = True
+
+        self.server = server_class(address, Handler)
+        self.server.daemon_threads = True
+        self.server.primary = self
+        self.address = self.server.server_address
+
+    def line(self, message: dict) -> bytes:
+        return json.dumps(message, ensure_ascii=False).encode() + b'\n'
+
+    def publish(self, change: dict) -> None:
+        '''`Отправить изменение репликам`'''
+
+        # изменение сериализуется сразу, потому что значение в базе данных может измениться позже
+        line = self.line(change)
+
+        with self.lock:
+            self.backlog.append((change['seq'], line))
+
+            for lines in self.replicas:
+                # реплика, которая не успевает получать изменения, отключается и затем догоняет заново
+                if lines.qsize() >= self.backlog.maxlen: lines.put(None)
+                else: lines.put(line)
+
+    def attach(self, request: dict) -> queue.Queue:
+        '''`Подключить реплику и подготовить для нее недостающие изменения`'''
+
+        lines = queue.Queue()
+        since = request.get('since')
+
+        with self.lock:
+            self.replicas.append(lines)
+            seq = self.db.seq
+
+            if request.get('id') == self.id and since is not None and since <= seq and \
+                (self.backlog[0][0] <= since + 1 if self.backlog else since == seq):
+
+                for item_seq, line in self.backlog:
+                    if item_seq > since: lines.put(line)
+                return lines
+
+        # данные сериализуются одним вызовом кодировщика, поэтому копия соответствует одному моменту.
+        # Изменения, которые попали и в копию, и в очередь, применяются повторно, что не меняет результат
+        data = json.dumps(self.db.data, ensure_ascii=False)
+        with lines.mutex: lines.queue.appendleft(f'{{"snapshot": {data}, "id": "{self.id}", "seq": {seq}}}\n'.encode())
+
+        return lines
+
+    def detach(self, lines: queue.Queue) -> None:
+        '''`Отключить реплику`'''
+
+        with self.lock:
+            if lines in self.replicas: self.replicas.remove(lines)
+
+    def beat(self) -> bytes:
+        '''`Сообщение о номере последнего изменения`'''
+        return self.line({'heartbeat': time.time(), 'seq': self.db.seq})
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def start(self) -> 'Primary':
+        '''`Запустить источник в фоновом потоке`'''
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        '''`Остановить источник и отключить реплики`'''
+
+        self.closed = True
+        self.db.unsubscribe(self.subscription)
+
+        with self.lock:
+            for lines in self.replicas: lines.put(None)
+
+        self.server.shutdown()
+        self.server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address): os.remove(self.address)
+
+class Replica:
+    '''
+    `Реплика базы данных`
+
+    Получает изменения от `Primary` и применяет их к своей базе данных через `apply`. Номер последнего
+    примененного изменения хранится в настройках базы данных, поэтому после перезапуска реплика догоняет источник
+    с этого номера, если данные реплики были сохранены
+
+    >>> replica = Replica(Database('replica.json'), ('127.0.0.1', 8766)).start()
+    >>> replica.wait(timeout=5)
+    >>> print(replica.lag, replica.behind)
+
+    Реплику можно сделать источником, например, когда источник недоступен:
+
+    >>> primary = replica.promote(('127.0.0.1', 8767))
+    '''
+
+    def __init__(self, db: Database, address: tuple[str, int] | str, reconnect: float | None = 1.0, commit_interval: float = 1.0):
+        '''
+        :param db: База данных реплики
+        :param address: Адрес источника
+        :param reconnect: Через сколько секунд переподключаться после разрыва соединения. None - не переподключаться
+        :param commit_interval: Как часто в секундах сохранять данные, если у базы данных включен `autocommit`
+        '''
+        if isinstance(address, list): address = tuple(address)
+
+        self.db = db
+        self.address = address
+        self.reconnect = reconnect
+        self.commit_interval = commit_interval
+        self.primary_seq = None
+        self.lag = None
+        self.closed = False
+        self.socket = None
+        self.synced = threading.Event()
+        self.committed = time.monotonic()
+
+    @property
+    def state(self) -> dict:
+        return self.db.data[self.db.settings].setdefault('replication', {'id': None, 'seq': None})
+
+    @property
+    def seq(self) -> int | None:
+        '''`Номер последнего примененного изменения`'''
+        return self.state['seq']
+
+    @property
+    def behind(self) -> int | None:
+        '''`На сколько изменений реплика отстает от источника по последнему известному номеру источника`'''
+        return None if self.primary_seq is None or self.seq is None else max(self.primary_seq - self.seq, 0)
+
+    def handle(self, message: dict) -> None:
+        '''`Применить сообщение источника`'''
+
+        if 'heartbeat' in message:
+            self.primary_seq = message['seq']
+            if self.seq is not None and self.seq >= self.primary_seq: self.lag = 0.0
+
+        elif 'snapshot' in message:
+            self.db.data = message['snapshot']
+            self.db.data[self.db.settings]['replication'] = {'id': message['id'], 'seq': message['seq']}
+            self.db.reindex()
+            self.primary_seq = max(self.primary_seq or 0, message['seq'])
+
+        else:
+            if self.seq is not None and message['seq'] <= self.seq: return
+            state = self.state
+            self.db.apply(message)
+            # после `drop` в настройках нет состояния репликации
+            self.db.data[self.db.settings]['replication'] = {**state, 'seq': message['seq']}
+            self.primary_seq = max(self.primary_seq or 0, message['seq'])
+            self.lag = max(time.time() - message['time'], 0.0)
+
+        self.db.dirty = True
+        if self.behind == 0: self.synced.set()
+
+        if self.db.autocommit and time.monotonic() - self.committed >= self.commit_interval: self.commit()
+
+    def commit(self) -> None:
+        '''`Сохранить данные реплики`'''
+
+        self.committed = time.monotonic()
+        self.db.commit()
+
+    def connect(self) -> None:
+        '''`Подключиться к источнику и применять изменения до разрыва соединения`'''
+
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(self.address)
+
+        try:
+            self.socket.sendall(json.dumps({'id': self.state['id'], 'since': self.seq}).encode() + b'\n')
+
+            with self.socket.makefile('rb') as file:
+                for line in file:
+                    if self.closed: break
+                    self.handle(json.loads(line))
+        finally:
+            self.socket.close()
+            self.synced.clear()
+
+    def run(self) -> None:
+        '''`Получать изменения, переподключаясь после разрыва соединения`'''
+
+        while not self.closed:
+            try: self.connect()
+            except OSError: ...
+
+            if self.reconnect is None or self.closed: break
+            time.sleep(self.reconnect)
+
+        if self.db.autocommit: self.commit()
+
+    def start(self) -> 'Replica':
+        '''`Запустить реплику в фоновом потоке`'''
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        '''`Дождаться, пока реплика догонит источник`'''
+        return self.synced.wait(timeout)
+
+    def close(self) -> None:
+        '''`Отключиться от источника`'''
+
+        self.closed = True
+
+        if self.socket is not None:
+            try: self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError: ...
+
+        if hasattr(self, 'thread'): self.thread.join()
+
+    def promote(self, address: tuple[str, int] | str, **kwargs) -> Primary:
+        '''
+        `Сделать реплику источником`
+
+        Реплика отключается от прежнего источника, а номера изменений продолжаются с последнего полученного номера
+
+        :param address: Адрес нового источника
+        :return: Запущенный источник
+        '''
+        self.close()
+        self.db.seq = max(self.db.seq, self.seq or 0)
+        return Primary(self.db, address, **kwargs).start()
+
+__all__ = ['Primary', 'Replica']
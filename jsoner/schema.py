@@ -0,0 +1,129 @@
+from typing import Any, Callable
+from .errors import SchemaError
+
+Validator = Callable[[Any], None]
+
+json_types = (str, int, float, bool, list, dict, tuple, type(None))
+
+def check_json(value: Any, path: str = '$') -> None:
+    '''`Проверить, что значение и все вложенные значения можно перевести в JSON`'''
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str): raise SchemaError(f"{path}: ключи словаря должны быть объектами класса str")
+            check_json(item, f'{path}.{key}')
+
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            check_json(item, f'{path}[{index}]')
+
+    elif not isinstance(value, json_types):
+        raise SchemaError(f'{path}: объекты типа {value.__class__.__name__} не поддерживаются для перевода в JSON')
+
+def compile_schema(schema: Any, path: str = '$') -> Validator:
+    '''
+    `Преобразовать схему в функцию проверки`
+
+    Схема разбирается один раз, а полученная функция только проверяет значения
+
+    `. . .`
+
+    Описание схемы:
+
+    `str`, `int`, `float`, `bool`, `list`, `dict` - значение должно быть объектом этого класса
+
+    `None` - значение должно быть None
+
+    `Any` или `object` - любое значение, которое можно перевести в JSON
+
+    `(int, None)` - кортеж схем, значение должно подходить под одну из них
+
+    `[int]` - список, все элементы которого подходят под схему
+
+    `{'name': str, 'age?': int}` - словарь с обязательным ключом `name` и необязательным `age`. Остальные ключи проверяются на 
+    возможность перевода в JSON
+
+    >>> validate = compile_schema({'name': str, 'tags': [str]})
+    >>> validate({'name': 'Ann', 'tags': [1]})
+    >>> raise SchemaError
+    '''
+
+    if schema is Any or schema is object:
+        return lambda value: check_json(value, path)
+
+    if schema is None:
+
+        def validate(value):
+            if value is not None: raise SchemaError(f'{path}: ожидалось None, получено {value!r}')
+
+        return validate
+
+    if schema is float:
+        schema = (int, float)
+
+    if isinstance(schema, type) or (isinstance(schema, tuple) and all(isinstance(item, type) for item in schema)):
+
+        name = schema.__name__ if isinstance(schema, type) else ' | '.join(item.__name__ for item in schema)
+        nested = schema in (list, dict) or (isinstance(schema, tuple) and (list in schema or dict in schema))
+
+        def validate(value):
+            if not isinstance(value, schema): 
+                raise SchemaError(f'{path}: ожидался {name}, получен {value.__class__.__name__}')
+            if nested: check_json(value, path)
+
+        return validate
+
+    if isinstance(schema, tuple):
+
+        variants = [compile_schema(item, path) for item in schema]
+
+        def validate(value):
+            for variant in variants:
+                try: return variant(value)
+                except SchemaError: ...
+            raise SchemaError(f'{path}: значение {value!r} не подходит ни под одну из схем')
+
+        return validate
+
+    if isinstance(schema, list):
+
+        if len(schema) != 1: raise ValueError('Схема списка должна состоять из одного элемента')
+
+        item_validator = compile_schema(schema[0], f'{path}[]')
+
+        def validate(value):
+            if not isinstance(value, (list, tuple)): 
+                raise SchemaError(f'{path}: ожидался list, получен {value.__class__.__name__}')
+            for item in value: item_validator(item)
+
+        return validate
+
+    if isinstance(schema, dict):
+
+        required = {}
+        optional = {}
+
+        for key, item in schema.items():
+            if key.endswith('?'): optional[key[:-1]] = compile_schema(item, f'{path}.{key[:-1]}')
+            else: required[key] = compile_schema(item, f'{path}.{key}')
+
+        def validate(value):
+            if not isinstance(value, dict): 
+                raise SchemaError(f'{path}: ожидался dict, получен {value.__class__.__name__}')
+
+            for key, item_validator in required.items():
+                try: item = value[key]
+                except KeyError: raise SchemaError(f"{path}: нет обязательного ключа '{key}'")
+                item_validator(item)
+
+            for key, item in value.items():
+                if key in required: continue
+                item_validator = optional.get(key)
+                if item_validator is None: check_json(item, f'{path}.{key}')
+                else: item_validator(item)
+
+        return validate
+    
+    raise ValueError(f'Неизвестная схема: {schema!r}')
+
+__all__ = ['compile_schema', 'check_json']
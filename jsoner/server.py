@@ -0,0 +1,391 @@
+import argparse
+import builtins
+import json
+import operator
+import os
+import queue
+import socket
+import socketserver
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable
+from . import errors
+from .cluster import Cluster
+from .columns import extract
+from .database import Database
+
+operations = (
+    'get', 'get_many', 'set', 'add', 'update', 'delete', 'incr', 'decr', 'incr_many',
+    'keys', 'values', 'items', 'commit', 'discard', 'scan_prefix', 'range', 'count_prefix', 'delete_prefix', 
+    'aggregate', 'set_default', 'set_global_tag', 'contains', 'find', 'batch'
+)
+
+conditions = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+    'contains': operator.contains,
+}
+
+def condition(path: str, name: str, argument: Any) -> Callable:
+    '''`Функция поиска из условия вида ('age', '>', 30)`'''
+
+    if name not in conditions: raise ValueError(f'Неизвестное условие {name}. Доступны: {", ".join(conditions)}')
+
+    check = conditions[name]
+    parts = path.split('.') if path else []
+
+    def predicate(value):
+        try: return check(extract(value, parts), argument)
+        except TypeError: return False
+
+    return predicate
+
+def tag_names(tags: dict) -> dict:
+    '''`Заменить классы тегов их именами`'''
+    return {tag if isinstance(tag, str) else tag.__name__: value for tag, value in tags.items()}
+
+class Handler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+
+        for line in self.rfile:
+            if not line.strip(): continue
+
+            request = {}
+
+            try:
+                request = json.loads(line)
+                response = {'id': request.get('id'), 'result': self.server.execute(request)}
+            except Exception as e:
+                response = {'id': request.get('id'), 'error': type(e).__name__, 'message': str(e)}
+
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b'\n')
+
+class Server:
+    '''
+    `Сервер базы данных`
+
+    Хранит одну базу данных или кластер в одном процессе и выполняет запросы клиентов `RemoteDatabase` 
+    через TCP или Unix-сокет. Все запросы выполняются по очереди, поэтому в памяти одна копия данных и один писатель
+
+    Протокол - строки JSON: `{"id": 1, "db": null, "op": "get", "args": ["key"], "kwargs": {}}`. 
+    Клиент может отправить несколько запросов, не дожидаясь ответов, ответы приходят в том же порядке
+
+    >>> server = Server(Database('data.json', autocommit=True), ('127.0.0.1', 8765))
+    >>> server.serve_forever()
+
+    Или из командной строки:
+
+    `python -m jsoner.server data.json --port 8765 --autocommit`
+    '''
+
+    def __init__(self, target: Database | type[Cluster], address: tuple[str, int] | str):
+        '''
+        :param target: База данных или подкласс кластера
+        :param address: Пара (хост, порт) для TCP или путь к Unix-сокету
+        '''
+        self.target = target
+        self.lock = threading.Lock()
+
+        if isinstance(address, str):
+            if os.path.exists(address): os.remove(address)
+            server_class = socketserver.ThreadingUnixStreamServer
+        else:
+            server_class = socketserver.ThreadingTCPServer
+            server_class.allow_reuse_address = True
+
+        self.server = server_class(address, Handler)
+        self.server.daemon_threads = True
+        self.server.execute = self.execute
+        self.address = self.server.server_address
+
+    def database(self, name: str | None) -> Database:
+        '''`База данных по имени из запроса`'''
+
+        if isinstance(self.target, Database):
+            if name is not None: raise ValueError('Сервер хранит одну базу данных, имя указывать не нужно')
+            return self.target
+        
+        if name not in self.target.databases: raise errors.KeyNotFound(f"База данных '{name}' не найдена")
+        return getattr(self.target, name)
+
+    def execute(self, request: dict) -> Any:
+        '''`Выполнить запрос`'''
+
+        with self.lock:
+            db = self.database(request.get('db'))
+
+            if request['op'] == 'batch':
+                return [self.call(db, op, args, kwargs) for op, args, kwargs in request['args'][0]]
+            
+            return self.call(db, request['op'], request.get('args', []), request.get('kwargs', {}))
+
+    def call(self, db: Database, op: str, args: list, kwargs: dict) -> Any:
+
+        if op not in operations or op == 'batch': raise ValueError(f'Неизвестная операция {op}')
+
+        match op:
+            case 'contains': return args[0] in db
+            case 'find': return db.find_all(condition(*args))
+            case _: return getattr(db, op)(*args, **kwargs)
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def start(self) -> 'Server':
+        '''`Запустить сервер в фоновом потоке`'''
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        '''`Остановить сервер`'''
+        self.server.shutdown()
+        self.server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address): os.remove(self.address)
+
+class Connection:
+
+    def __init__(self, address: tuple[str, int] | str, timeout: float | None):
+
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(address)
+        if family == socket.AF_INET: self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.socket.makefile('rb')
+        self.id = 0
+
+    def request(self, requests: list[dict]) -> list[dict]:
+        '''`Отправить запросы одним пакетом и прочитать ответы`'''
+
+        lines = []
+        for request in requests:
+            self.id += 1
+            lines.append(json.dumps({'id': self.id, **request}, ensure_ascii=False))
+
+        self.socket.sendall(('\n'.join(lines) + '\n').encode())
+
+        responses = []
+        for _ in requests:
+            line = self.file.readline()
+            if not line: raise ConnectionError('Сервер закрыл соединение')
+            responses.append(json.loads(line))
+
+        return responses
+    
+    def close(self) -> None:
+        self.file.close()
+        self.socket.close()
+
+def result(response: dict) -> Any:
+    '''`Результат ответа или исключение сервера`'''
+
+    if 'error' not in response: return response['result']
+
+    error = getattr(errors, response['error'], None) or getattr(builtins, response['error'], None)
+    if not (isinstance(error, type) and issubclass(error, Exception)): error = RuntimeError
+
+    raise error(response['message'])
+
+class Pipeline:
+    '''
+    `Пакет запросов`
+
+    Запросы накапливаются и отправляются одним пакетом при выходе из `with`, результаты - в атрибуте `results`
+    '''
+
+    def __init__(self, remote: 'RemoteDatabase'):
+        self.remote = remote
+        self.requests = []
+        self.results = []
+
+    def __getattr__(self, op: str) -> Callable:
+
+        if op not in operations: raise AttributeError(op)
+
+        def call(*args, **kwargs):
+            self.requests.append(self.remote.request(op, args, kwargs))
+
+        return call
+    
+    def execute(self) -> list:
+        '''`Отправить накопленные запросы`'''
+
+        with self.remote.connection() as connection:
+            responses = connection.request(self.requests)
+
+        self.requests = []
+        self.results = [result(response) for response in responses]
+        return self.results
+
+    def __enter__(self) -> 'Pipeline':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None: self.execute()
+
+class RemoteDatabase:
+    '''
+    `Клиент сервера базы данных`
+
+    Поддерживает те же методы, что и `Database`: `get`, `set`, `add`, `update`, `delete`, `incr`, `keys`, `items`, 
+    `scan_prefix`, `aggregate` и другие. Соединения с сервером переиспользуются
+
+    >>> db = RemoteDatabase(('127.0.0.1', 8765))
+    >>> db['key'] = 'value'
+    >>> db.incr('counter')
+
+    `. . .`
+
+    Несколько запросов можно отправить одним пакетом:
+
+    >>> with db.pipeline() as pipe:
+    >>>     pipe.get('key')
+    >>>     pipe.incr('counter')
+    >>> print(pipe.results)
+
+    Или выполнить на сервере без перерыва другими клиентами:
+
+    >>> db.batch([('incr', ['a']), ('incr', ['b'])])
+
+    `find_all` и `find_one` с функцией фильтруют данные на стороне клиента. С условием вида `('age', '>', 30)` 
+    поиск выполняется на сервере
+    '''
+
+    def __init__(self, address: tuple[str, int] | str, db: str | None = None, pool_size: int = 4, timeout: float | None = 30):
+        '''
+        :param address: Пара (хост, порт) или путь к Unix-сокету
+        :param db: Имя базы данных, если сервер хранит кластер
+        :param pool_size: Сколько соединений держать открытыми
+        :param timeout: Время ожидания ответа в секундах
+        '''
+        if isinstance(address, list): address = tuple(address)
+
+        self.address = address
+        self.db = db
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(pool_size)
+
+    @contextmanager
+    def connection(self):
+        '''`Взять соединение из пула`'''
+
+        try: connection = self.pool.get_nowait()
+        except queue.Empty: connection = Connection(self.address, self.timeout)
+
+        try:
+            yield connection
+        except:
+            connection.close()
+            raise
+
+        try: self.pool.put_nowait(connection)
+        except queue.Full: connection.close()
+
+    def request(self, op: str, args: tuple = (), kwargs: dict = {}) -> dict:
+
+        args = list(args)
+        if op in ('add', 'set') and len(args) > 2: args[2] = tag_names(args[2])
+        if 'tags' in kwargs: kwargs = {**kwargs, 'tags': tag_names(kwargs['tags'])}
+        if op == 'set_global_tag' and not isinstance(args[0], str): args[0] = args[0].__name__
+
+        return {'db': self.db, 'op': op, 'args': args, 'kwargs': kwargs}
+
+    def call(self, op: str, *args, **kwargs) -> Any:
+        '''`Выполнить операцию на сервере`'''
+
+        with self.connection() as connection:
+            return result(connection.request([self.request(op, args, kwargs)])[0])
+        
+    def __getattr__(self, op: str) -> Callable:
+
+        if op not in operations or op == 'batch': raise AttributeError(op)
+        return lambda *args, **kwargs: self.call(op, *args, **kwargs)
+    
+    def batch(self, ops: list[tuple]) -> list:
+        '''
+        `Выполнить несколько операций подряд`
+
+        :param ops: Список из (операция, аргументы) или (операция, аргументы, именованные аргументы)
+        '''
+        requests = []
+        for op, args, *kwargs in ops:
+            request = self.request(op, args, kwargs[0] if kwargs else {})
+            requests.append((op, request['args'], request['kwargs']))
+
+        return self.call('batch', requests)
+
+    def pipeline(self) -> Pipeline:
+        '''`Пакет запросов, отправляемых вместе`'''
+        return Pipeline(self)
+    
+    def find_all(self, func: Callable | tuple) -> list[tuple[str, Any]]:
+        '''`Поиск всех подходящих значений`'''
+
+        if isinstance(func, tuple): return [tuple(item) for item in self.call('find', *func)]
+        return [(key, value) for key, value in self.call('items') if func(value)]
+    
+    def find_one(self, func: Callable | tuple) -> tuple[str, Any] | None:
+        '''`Поиск первого подходящего значения`'''
+
+        found = self.find_all(func)
+        return found[0] if found else None
+
+    def items(self) -> list[tuple[str, Any]]:
+        '''`Все пары ключ-значение`'''
+        return [tuple(item) for item in self.call('items')]
+
+    def __getitem__(self, key: str) -> Any:
+        return self.call('get', str(key))
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.call('set', key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self.call('contains', key)
+    
+    def close(self) -> None:
+        '''`Закрыть все соединения`'''
+
+        while True:
+            try: self.pool.get_nowait().close()
+            except queue.Empty: break
+
+def main(argv: list[str] | None = None) -> None:
+
+    parser = argparse.ArgumentParser(prog='python -m jsoner.server', description='Сервер базы данных Jsoner')
+    parser.add_argument('path', help='Путь к файлу базы данных или к папке кластера (с флагом --cluster)')
+    parser.add_argument('--cluster', action='store_true', help='Хранить кластер из папки')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Путь к Unix-сокету вместо TCP')
+    parser.add_argument('--autocommit', action='store_true')
+    parser.add_argument('--journal', help='Путь к журналу изменений')
+    args = parser.parse_args(argv)
+
+    if args.cluster:
+        target = type('cluster', (Cluster,), {'folder_path': args.path, 'autocommit': args.autocommit})
+    else:
+        target = Database(args.path, autocommit=args.autocommit, journal=args.journal)
+
+    server = Server(target, args.unix or (args.host, args.port))
+    print(f'Jsoner: сервер запущен на {server.address}')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        ...
+    finally:
+        server.close()
+        if isinstance(target, Database): target.commit()
+        else: target.commit_all()
+
+if __name__ == '__main__':
+    main()
+
+__all__ = ['Server', 'RemoteDatabase']
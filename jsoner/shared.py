@@ -0,0 +1,186 @@
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Callable
+from .check import Check
+
+magic = b'JSONER1\n'
+header = struct.Struct('<QQQ')
+
+class SharedDatabase:
+    '''
+    `База данных только для чтения, общая для многих процессов`
+
+    Открывает файл, созданный `SharedDatabase.build`, через `mmap`. Страницы файла находятся в кэше операционной системы 
+    и общие для всех процессов, а каждый процесс хранит только индекс ключей. Значения декодируются при первом чтении 
+    и запоминаются
+
+    Когда `build` записывает новое поколение файла, читатели открывают его при следующем обращении 
+    (не чаще, чем раз в `check_interval` секунд)
+
+    >>> SharedDatabase.build(db, 'data.shared')
+    >>> # в процессах-читателях
+    >>> shared = SharedDatabase('data.shared')
+    >>> shared.get('key')
+    >>> 'value'
+
+    Теги не вызываются, кроме TTL: ключи с истекшим временем жизни возвращают значение по умолчанию
+    '''
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        '''
+        :param path: Путь к файлу, созданному `SharedDatabase.build`
+        :param check_interval: Как часто (в секундах) проверять появление нового поколения файла
+        '''
+        self.path = path
+        self.check_interval = check_interval
+        self.mmap = None
+        self.open()
+
+    @staticmethod
+    def build(db, path: str) -> int:
+        '''
+        `Записать файл для SharedDatabase`
+
+        Файл записывается во временный файл и заменяет старый, поэтому открытые читатели продолжают читать старое поколение
+
+        :param db: База данных
+        :param path: Путь к файлу
+        :return: Номер поколения файла
+        '''
+        try:
+            with open(path, 'rb') as file:
+                generation = header.unpack(file.read(len(magic) + header.size)[len(magic):])[0] + 1
+        except (FileNotFoundError, struct.error):
+            generation = 1
+
+        settings = db.data[db.settings]
+        now = time.time()
+        keys = {}
+
+        with open(path + '.tmp', 'wb') as file:
+            file.write(magic + header.pack(0, 0, 0))
+            offset = file.tell()
+
+            for key in db.keys():
+                ttl = {**settings['global_tags'], **settings['tags'].get(key, {})}.get('ttl')
+                if ttl is not None and ttl < now: continue
+
+                value = json.dumps(db.data[key], ensure_ascii=False).encode()
+                file.write(value)
+                keys[key] = (offset, len(value))
+                offset += len(value)
+
+            index = json.dumps({
+                'default': settings['default'],
+                'tags': settings['tags'],
+                'global_tags': settings['global_tags'],
+                'keys': keys
+            }, ensure_ascii=False).encode()
+
+            file.write(index)
+            file.seek(len(magic))
+            file.write(header.pack(generation, offset, len(index)))
+
+        os.replace(path + '.tmp', path)
+
+        return generation
+
+    def open(self) -> None:
+        '''`Открыть текущее поколение файла`'''
+
+        with open(self.path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapping[:len(magic)] != magic:
+            mapping.close()
+            raise ValueError(f'{self.path} не является файлом SharedDatabase')
+
+        self.generation, offset, length = header.unpack_from(mapping, len(magic))
+        index = json.loads(mapping[offset:offset + length])
+
+        if self.mmap is not None: self.mmap.close()
+
+        self.mmap = mapping
+        self.index = index['keys']
+        self.default = index['default']
+        self.tags = index['tags']
+        self.global_tags = index['global_tags']
+        self.memo = {}
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self.checked = time.monotonic()
+
+    def refresh(self) -> None:
+        '''`Открыть новое поколение файла, если оно появилось`'''
+
+        if time.monotonic() - self.checked < self.check_interval: return
+        self.checked = time.monotonic()
+
+        try: stat = os.stat(self.path)
+        except FileNotFoundError: return
+
+        if (stat.st_ino, stat.st_mtime_ns) != self.identity: self.open()
+
+    def get(self, key: str) -> Any:
+        '''`Получить значение по ключу`'''
+
+        Check.is_key_string(key)
+        self.refresh()
+
+        if key not in self.index: return self.default
+
+        ttl = self.tags[key].get('ttl', self.global_tags.get('ttl')) if key in self.tags else self.global_tags.get('ttl')
+        if ttl is not None and time.time() > ttl: return self.default
+
+        try:
+            return self.memo[key]
+        except KeyError:
+            offset, length = self.index[key]
+            value = self.memo[key] = json.loads(self.mmap[offset:offset + length])
+            return value
+        
+    def get_many(self, keys: list[str]) -> list[Any]:
+        '''`Получить значения по нескольким ключам`'''
+        return [self.get(key) for key in keys]
+
+    def keys(self) -> list[str]:
+        '''`Все ключи`'''
+        self.refresh()
+        return list(self.index)
+
+    def values(self) -> list[Any]:
+        '''`Все значения`'''
+        return self.get_many(self.keys())
+    
+    def items(self) -> list[tuple[str, Any]]:
+        '''`Все пары ключ-значение`'''
+        return [(key, self.get(key)) for key in self.keys()]
+    
+    def find_all(self, func: Callable) -> list[tuple[str, Any]]:
+        '''`Поиск всех подходящих значений`'''
+        return [(key, value) for key, value in self.items() if func(value)]
+    
+    def find_one(self, func: Callable) -> tuple[str, Any] | None:
+        '''`Поиск первого подходящего значения`'''
+
+        for key in self.keys():
+            if func(value := self.get(key)): return key, value
+    
+    def __getitem__(self, key: str) -> Any:
+        return self.get(str(key))
+    
+    def __contains__(self, key: str) -> bool:
+        self.refresh()
+        return key in self.index
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def close(self) -> None:
+        if self.mmap is not None: self.mmap.close()
+        self.mmap = None
+
+__all__ = ['SharedDatabase']
@@ -13,6 +13,10 @@ class NewTag:
         return new_value
     def read(db: Database, key: str, value, tag_arg):
         return value
+    def read_many(db: Database, keys: list[str], values: list, tag_args: list) -> list:
+        return values
+    def update_many(db: Database, keys: list[str], old_values: list, new_values: list, tag_args: list) -> list:
+        return new_values
 
     `. . .`
 
@@ -28,6 +32,10 @@ class NewTag:
     `update` - Вызывается при обновлении значения ключа. Не влияет на методы `INCR` и `DECR` в классе `Database`. Чтобы запретить обновление, следует вызвать любую ошибку
 
     `read` - Вызывается при чтении значения ключа. Если у ключа несколько тегов, то вызывается у первого тега, в котором он есть
+
+    `read_many`, `update_many` - Необязательные пакетные версии `read` и `update`. Методы `get_many`, `values`, `items` 
+    и `update_many` класса `Database` группируют ключи с одинаковым набором тегов и вызывают их один раз на группу. 
+    Должны вернуть список значений в том же порядке. Если пакетного метода нет, вызывается обычный для каждого ключа
  
     `. . .`
 
@@ -59,6 +67,9 @@ class NewTag:
 
 class Tags:
 
+    pipelines = {}
+    version = 0
+
     @staticmethod
     def create(self, key: str, value, tags: dict) -> None:
         global_tags = Tags.get(self, key)
@@ -101,6 +112,41 @@ class Tags:
         except:
             ...
 
+    @staticmethod
+    def pipeline(names: tuple[str, ...], hooks: tuple[str, ...]) -> list[tuple[str, type[NewTag]]]:
+        '''
+        `Классы тегов, у которых есть хотя бы один из методов hooks, для набора имен тегов`
+
+        Результат запоминается для каждого набора имен, поэтому при чтении и изменении не нужно каждый раз 
+        перебирать все теги
+        '''
+        if Tags.version != len(NewTag.all):
+            Tags.pipelines = {}
+            Tags.version = len(NewTag.all)
+
+        try:
+            return Tags.pipelines[(names, hooks)]
+        except KeyError:
+            pipeline = Tags.pipelines[(names, hooks)] = [
+                (tag_name, cls) for tag_name in names for cls in NewTag.all 
+                if cls.__name__ == tag_name and any(hasattr(cls, hook) for hook in hooks)
+            ]
+            return pipeline
+
+    @staticmethod
+    def read(self, cls: type[NewTag], keys: list[str], values: list, tag_args: list) -> list:
+        '''`Вызвать read_many или read для каждого ключа`'''
+
+        if hasattr(cls, 'read_many'): return list(cls.read_many(self, keys, values, tag_args))
+        return [cls.read(self, key, value, tag_arg) for key, value, tag_arg in zip(keys, values, tag_args)]
+    
+    @staticmethod
+    def update(self, cls: type[NewTag], keys: list[str], old_values: list, new_values: list, tag_args: list) -> list:
+        '''`Вызвать update_many или update для каждого ключа`'''
+
+        if hasattr(cls, 'update_many'): return list(cls.update_many(self, keys, old_values, new_values, tag_args))
+        return [cls.update(self, *args) for args in zip(keys, old_values, new_values, tag_args)]
+
     @staticmethod
     def get(self, key: str) -> dict[str, Any]:
         stngs = self.data[self.settings]
@@ -136,6 +182,114 @@ class const_tag(NewTag):
     def read(db, key: str, value, tag_arg):
         return value
     
+class ForeignKeys:
+    '''
+    `Индекс внешних ключей базы данных`
+
+    Хранит множества значений списков, на которые ссылаются ключи, чтобы проверка `foreign_key` выполнялась за O(1), 
+    и обратные ссылки: какие ключи ссылаются на каждый список. Создается при первом обращении через `ForeignKeys.of(db)` 
+    и обновляется при каждом изменении базы данных
+
+    Учитываются теги `foreign_key`, установленные для ключей. Глобальный тег `foreign_key` в обратных ссылках не учитывается
+    '''
+
+    def __init__(self, db):
+        self.db = db
+        self.sets = {}
+        self.references = {}
+        self.targets = {}
+
+        for key, tags in db.data[db.settings]['tags'].items():
+            if 'foreign_key' in tags: self.link(key, tags['foreign_key'])
+
+    @staticmethod
+    def of(db) -> 'ForeignKeys':
+        '''`Индекс внешних ключей базы данных`'''
+
+        if db.foreign_keys is None: db.foreign_keys = ForeignKeys(db)
+        return db.foreign_keys
+
+    def link(self, key: str, target: str) -> None:
+        self.unlink(key)
+        self.targets[key] = target
+        self.references.setdefault(target, set()).add(key)
+
+    def unlink(self, key: str) -> None:
+        if (target := self.targets.pop(key, None)) is not None:
+            self.references[target].discard(key)
+            if not self.references[target]: del self.references[target]
+
+    def allowed(self, target: str) -> set | list:
+        '''`Множество значений списка. Если значения нельзя хэшировать - сам список`'''
+
+        try:
+            return self.sets[target]
+        except KeyError:
+            values = self.db.data[target]
+            try: allowed = set(values)
+            except TypeError: allowed = values
+            self.sets[target] = allowed
+            return allowed
+        
+    def contains(self, target: str, value) -> bool:
+        '''`Есть ли значение в списке по ключу target`'''
+
+        try: return value in self.allowed(target)
+        except TypeError: return value in self.db.data[target]
+
+    def referrers(self, target: str) -> set[str]:
+        '''`Ключи, которые ссылаются на target`'''
+        return self.references.get(target, set())
+
+    def check_update(self, key: str, value) -> None:
+        '''`Проверить, что новое значение списка содержит все значения ссылающихся на него ключей`'''
+
+        if not (referrers := self.referrers(key)): return
+
+        if not isinstance(value, list): 
+            raise ForeignKeyError(f"На ключ '{key}' ссылаются внешние ключи, его значение должно быть списком")
+        
+        try: allowed = set(value)
+        except TypeError: allowed = value
+
+        for referrer in referrers:
+            if self.db.data[referrer] not in allowed:
+                raise ForeignKeyError(f"Значение '{self.db.data[referrer]}' ключа '{referrer}' исчезнет из списка '{key}'")
+
+    def check_delete(self, key: str) -> None:
+        '''`Запретить удаление списка, на который ссылаются ключи`'''
+
+        if referrers := self.referrers(key):
+            raise ForeignKeyError(f"На ключ '{key}' ссылаются ключи: {', '.join(sorted(referrers))}")
+        
+    def check(self) -> list[tuple[str, Any, str]]:
+        '''`Все ключи, значения которых отсутствуют в списках, на которые они ссылаются`'''
+
+        violations = []
+
+        for key, target in self.targets.items():
+            value = self.db.data.get(key)
+            if target not in self.db.data or not isinstance(self.db.data[target], list) or not self.contains(target, value):
+                violations.append((key, value, target))
+
+        return violations
+
+    def apply(self, event: str, key: str | None, extra: dict) -> None:
+        '''`Обновить индекс по изменению базы данных`'''
+
+        self.sets.pop(key, None)
+
+        match event:
+            case 'add':
+                if (tags := extra.get('tags')) and 'foreign_key' in tags: self.link(key, tags['foreign_key'])
+                else: self.unlink(key)
+            case 'delete' | 'expire':
+                self.unlink(key)
+            case 'evict' if not extra.get('spilled'):
+                self.unlink(key)
+            case 'drop':
+                self.sets, self.references, self.targets = {}, {}, {}
+
 class foreign_key_tag(NewTag):
     '''
     `Внешний ключ`
@@ -144,6 +298,10 @@ class foreign_key_tag(NewTag):
 
     В аргументе тега следует указать ключ, где значение - спискок возможных значений
 
+    Значения списков хранятся в индексе-множестве, поэтому проверка не зависит от длины списка. Список, на который 
+    ссылаются ключи, нельзя удалить, а при изменении в нем должны остаться значения всех ссылающихся ключей. 
+    Проверить все внешние ключи можно методом `db.check_foreign_keys()`
+
     `. . .`
     >>> db.set('user_roles', ['admin', 'moderator', 'member'], {const_tag: True})  
     >>> db.set('user1', 'admin', {foreign_key_tag: 'user_roles'})
@@ -160,11 +318,14 @@ class foreign_key_tag(NewTag):
         
         assert isinstance(db.data[tag], list), 'Внешний ключ должен состоять из списка возможных значений'
 
+        if not ForeignKeys.of(db).contains(tag, value):
+            raise ForeignKeyError(f"Значения '{value}' нет в {db.data[tag]}")
+
         return tag
 
     def update(db, key, old_value, new_value, tag_arg):
 
-        if not new_value in db.data[tag_arg]:
+        if not ForeignKeys.of(db).contains(tag_arg, new_value):
             raise ForeignKeyError(f"Значения '{new_value}' нет в {db.data[tag_arg]}")
         
         return new_value
@@ -192,9 +353,20 @@ class ttl_tag(NewTag):
         if time.time() <= tag_arg:
             return value
         else:
-            db.delete(key)
+            db.expire(key)
             return db.data[db.settings]['default']
         
+    def read_many(db, keys, values, tag_args):
+        now = time.time()
+        expired = [key for key, tag_arg in zip(keys, tag_args) if now > tag_arg]
+
+        if not expired: return values
+
+        db.expire(*expired)
+        default = db.data[db.settings]['default']
+
+        return [value if now <= tag_arg else default for value, tag_arg in zip(values, tag_args)]
+        
 class typing_tag(NewTag):
     '''
     `Улучшенное изменение значений`
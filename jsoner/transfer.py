@@ -0,0 +1,98 @@
+import csv
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator
+
+flat_types = (str, int, float, bool, type(None))
+
+@contextmanager
+def opened(path_or_stream: str | IO, mode: str, encoding: str):
+    '''`Открыть файл по пути или использовать переданный поток`'''
+
+    if isinstance(path_or_stream, str):
+        with open(path_or_stream, mode, encoding=encoding, newline='' if 'b' not in mode else None) as file:
+            yield file
+    else:
+        yield path_or_stream
+
+def batches(iterable: Iterable, size: int) -> Iterator[list]:
+    '''`Разбить поток на списки длиной size`'''
+
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)): yield batch
+
+def parse_ndjson(lines: list[str]) -> list[tuple[str, Any, dict | None]]:
+    '''`Разобрать строки NDJSON в записи (ключ, значение, теги)`'''
+
+    # одна пачка разбирается одним вызовом json.loads как массив - так намного быстрее, чем по строке
+    parsed = json.loads('[' + ','.join(line for line in lines if not line.isspace()) + ']')
+
+    return [(record['key'], record['value'], record.get('tags')) for record in parsed]
+
+def parse_csv_value(text: str) -> Any:
+    '''`Число, True, False или None из CSV, иначе строка`'''
+
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return text
+
+    return value if isinstance(value, flat_types) else text
+
+def read_ndjson(stream: IO, batch_size: int, workers: int | None) -> Iterator[list[tuple[str, Any, dict | None]]]:
+    '''
+    `Читать записи NDJSON пачками`
+
+    Если указан `workers`, то пачки разбираются в пуле процессов. Одновременно обрабатывается не больше `2 * workers` пачек,
+    поэтому память не зависит от размера файла
+    '''
+
+    if not workers:
+        for lines in batches(stream, batch_size): yield parse_ndjson(lines)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = deque()
+
+        for lines in batches(stream, batch_size):
+            futures.append(executor.submit(parse_ndjson, lines))
+            if len(futures) >= 2 * workers: yield futures.popleft().result()
+
+        while futures: yield futures.popleft().result()
+
+def read_csv(stream: IO, batch_size: int) -> Iterator[list[tuple[str, Any, None]]]:
+    '''`Читать пары ключ-значение из CSV пачками`'''
+
+    rows = csv.reader(stream)
+    header = next(rows, None)
+
+    if header is None: return
+    if header != ['key', 'value']: yield [(header[0], parse_csv_value(header[1]), None)]
+
+    for batch in batches(rows, batch_size):
+        yield [(key, parse_csv_value(value), None) for key, value in batch]
+
+def ndjson_line(key: str, value: Any, tags: dict | None) -> str:
+
+    record = {'key': key, 'value': value}
+    if tags: record['tags'] = tags
+
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+def write_csv(stream: IO, items: Iterable[tuple[str, Any]]) -> None:
+    '''`Записать пары ключ-значение в CSV`'''
+
+    writer = csv.writer(stream)
+    writer.writerow(['key', 'value'])
+
+    for key, value in items:
+
+        if not isinstance(value, flat_types):
+            raise TypeError(f"Значение ключа '{key}' типа {value.__class__.__name__} нельзя записать в CSV")
+
+        writer.writerow([key, value if isinstance(value, str) else json.dumps(value)])
+
+__all__ = []
@@ -0,0 +1,64 @@
+import pytest
+from jsoner import Database
+from jsoner.columns import Column
+
+users = {
+    'user:Ann': {'age': 30, 'job': 'Data Analyst'},
+    'user:Bob': {'age': 25, 'job': 'Python Developer'},
+    'user:John': {'age': 35, 'job': 'Team Lead'},
+    'user:Kate': {'age': 40, 'job': 'Team Lead'},
+}
+
+@pytest.fixture
+def users_db(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    for key, value in users.items(): db.add(key, value)
+    db.add('counter', 100)
+    db.add('flag', True)
+    return db
+
+@pytest.mark.parametrize(
+        'operation, expected',
+        [
+            ['count', 4],
+            ['sum', 130],
+            ['min', 25],
+            ['max', 40],
+            ['avg', 32.5],
+            ['top', [('user:Kate', 40), ('user:John', 35)]],
+        ]
+)
+def test_aggregate(users_db, operation, expected):
+    assert users_db.aggregate(operation, 'age', k=2) == expected
+
+def test_aggregate_values(users_db):
+    assert users_db.aggregate('sum') == 100
+    assert users_db.aggregate('count', prefix='user:') == 0
+
+def test_aggregate_group_by(users_db):
+    assert users_db.aggregate('count', 'age', group_by='job') == {'Data Analyst': 1, 'Python Developer': 1, 'Team Lead': 2}
+    assert users_db.aggregate('avg', 'age', group_by='job')['Team Lead'] == 37.5
+    assert users_db.aggregate('max', 'age', group_by='job')['Team Lead'] == 40
+
+def test_aggregate_follows_writes(users_db):
+    assert users_db.aggregate('sum', 'age') == 130
+
+    users_db.update('user:Ann', {'age': 31, 'job': 'Team Lead'})
+    users_db.delete('user:Bob')
+    users_db.add('user:Mike', {'age': 20, 'job': 'Python Developer'})
+
+    assert users_db.aggregate('sum', 'age') == 126
+    assert users_db.aggregate('count', 'age', group_by='job') == {'Python Developer': 1, 'Team Lead': 3}
+
+    users_db.drop()
+    assert users_db.aggregate('sum', 'age') == 0
+
+def test_column_remove():
+    column = Column()
+    column.build([('a', 1), ('b', 2), ('c', 3)])
+    column.remove('a')
+    column.set('b', 'not a number')
+
+    assert column.keys == ['c']
+    assert list(column.values) == [3]
+    assert column.positions == {'c': 0}
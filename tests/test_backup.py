@@ -0,0 +1,92 @@
+import json
+import time
+from jsoner import Database, Cluster
+from jsoner.tags import ttl_tag
+
+def make_db(tmp_path, **kwargs):
+    return Database(str(tmp_path / 'data.json'), journal=str(tmp_path / 'data.journal'), autocommit=True, **kwargs)
+
+def test_commit_replaces_file(tmp_path):
+    db = make_db(tmp_path)
+    db.add('key', 'value')
+
+    assert [file.name for file in tmp_path.iterdir() if file.suffix == '.tmp'] == []
+    assert json.loads((tmp_path / 'data.json').read_text())['key'] == 'value'
+
+def test_snapshot(tmp_path):
+    db = make_db(tmp_path)
+    db.add('key', 'value')
+
+    seq = db.snapshot(str(tmp_path / 'snapshot.json'))
+    db.add('other', 1)
+
+    copy = Database(str(tmp_path / 'snapshot.json'))
+    assert copy.items() == [('key', 'value')]
+    assert copy.data[copy.settings]['snapshot']['seq'] == seq == 1
+
+def test_restore_point_in_time(tmp_path):
+    db = make_db(tmp_path)
+    db.add('a', 1)
+    db.snapshot(str(tmp_path / 'snapshot.json'))
+
+    db.add('b', 2, {ttl_tag: 60})
+    db.incr('a', 10)
+    moment = time.time()
+    time.sleep(0.01)
+    db.delete('b')
+    db.set_default(0)
+
+    db.restore(str(tmp_path / 'snapshot.json'), at=moment)
+    assert db.items() == [('a', 11), ('b', 2)]
+    assert 'b' in db.data[db.settings]['tags']
+    assert 'snapshot' not in db.data[db.settings]
+
+    db.restore(str(tmp_path / 'snapshot.json'))
+    assert db.items() == [('a', 11)]
+    assert db['missing'] == 0
+
+def test_incremental_backup(tmp_path):
+    db = make_db(tmp_path)
+    db.add('a', 1)
+    seq = db.snapshot(str(tmp_path / 'snapshot.json'))
+
+    db.add('b', 2)
+    seq = db.backup(str(tmp_path / 'backup.journal'), since=seq)
+    db.add('c', 3)
+    seq = db.backup(str(tmp_path / 'backup.journal'), since=seq)
+    assert seq == 3
+
+    restored = Database(str(tmp_path / 'restored.json'), key_index=True)
+    restored.restore(str(tmp_path / 'snapshot.json'), journal=str(tmp_path / 'backup.journal'))
+
+    assert restored.items() == [('a', 1), ('b', 2), ('c', 3)]
+    assert list(restored.index) == ['a', 'b', 'c']
+
+def test_cluster_snapshot(tmp_path):
+    (tmp_path / 'db').mkdir()
+    Database(str(tmp_path / 'db' / 'users.json'))
+
+    class db(Cluster):
+        folder_path = str(tmp_path / 'db')
+
+    db.users.add('Bob', 25)
+    db.commit_all()
+    db.users.add('Ann', 30)
+    db.snapshot(str(tmp_path / 'backup'))
+
+    assert Database(str(tmp_path / 'backup' / 'users.json')).keys() == ['Bob']
+
+def test_snapshot_skips_uncommitted(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), journal=str(tmp_path / 'data.journal'))
+    db.add('a', 1)
+    db.commit()
+
+    db.add('x', 'uncommitted')
+    db.snapshot(str(tmp_path / 'snapshot.json'))
+    db.discard()
+
+    db.add('y', 2)
+    db.commit()
+
+    db.restore(str(tmp_path / 'snapshot.json'))
+    assert db.items() == [('a', 1), ('y', 2)]
@@ -0,0 +1,27 @@
+import json
+from jsoner import bench
+
+def test_threads_cluster():
+    report = bench.run('mixed', 'cluster', threads=2, duration=0.3, keys=100, databases=2, interval=0.1)
+    summary = report['summary']
+
+    assert summary['ops'] == sum(item['count'] for item in summary['operations'].values()) > 0
+    assert summary['latency']['p50'] <= summary['latency']['p99'] <= summary['latency']['max']
+    assert set(summary['operations']) == {'get', 'set', 'add'}
+    assert sum(summary['errors'].values()) == 0
+    assert report['timeline'] and report['timeline'][-1]['file_size'] > 0
+
+def test_processes_and_compare(tmp_path):
+    base = bench.run('counters', threads=1, duration=0.2, keys=10, interval=0.1)
+    bench.main(['run', '--profile', 'ttl', '--processes', '2', '--duration', '0.3', '--keys', '10', '--interval', '0.1',
+                '--ttl', '0.05', '--output', str(tmp_path / 'new.json')])
+
+    new = json.loads((tmp_path / 'new.json').read_text())
+    assert new['config']['processes'] == 2 and new['summary']['ops'] > 0
+    assert sum(new['summary']['errors'].values()) == 0
+
+    (tmp_path / 'base.json').write_text(json.dumps(base))
+    bench.main(['compare', str(tmp_path / 'base.json'), str(tmp_path / 'new.json'), '--output', str(tmp_path / 'compare.html')])
+
+    page = (tmp_path / 'compare.html').read_text(encoding='utf-8')
+    assert base['name'] in page and new['name'] in page and '<svg' in page
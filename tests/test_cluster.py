@@ -0,0 +1,70 @@
+import json
+import pytest
+from jsoner import Cluster, Database, ChangeFeed
+
+def make_cluster(tmp_path, *names):
+    for name in names:
+        Database(str(tmp_path / f'{name}.json'))
+
+    class db(Cluster):
+        folder_path = str(tmp_path)
+
+    return db
+
+def read(path):
+    with open(path) as file:
+        return json.load(file)
+
+def test_databases(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+    assert sorted(db.databases) == ['cluster_settings', 'data', 'users']
+
+def test_commit_all_dirty_only(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+
+    assert db.commit_all() == []
+
+    db.users.add('Ann', 30)
+    assert db.commit_all() == ['users']
+    assert read(tmp_path / 'users.json')['Ann'] == 30
+    assert not db.users.dirty
+
+def test_commit_all_processes(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+
+    db.users.add('Ann', 30)
+    db.data.add('key', 'value')
+
+    assert sorted(db.commit_all(processes=True, workers=2)) == ['data', 'users']
+    assert read(tmp_path / 'data.json')['key'] == 'value'
+
+def test_commit_all_checkpoint(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+
+    db.users.add('Ann', 30)
+
+    assert sorted(db.commit_all(checkpoint=True)) == ['cluster_settings', 'data', 'users']
+    assert read(tmp_path / 'users.json')['Ann'] == 30
+    assert not any(file.suffix == '.tmp' for file in tmp_path.iterdir())
+
+def test_commit_all_checkpoint_failure(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+
+    db.users.add('Ann', 30)
+    db.data.data['key'] = {1, 2}
+
+    with pytest.raises(TypeError):
+        db.commit_all(checkpoint=True)
+
+    assert 'Ann' not in read(tmp_path / 'users.json')
+    assert not any(file.suffix == '.tmp' for file in tmp_path.iterdir())
+
+def test_commit_all_journal(tmp_path):
+    db = make_cluster(tmp_path, 'users', 'data')
+    db.users.journal = str(tmp_path / 'users.journal')
+
+    db.users.add('Ann', 30)
+    db.commit_all()
+
+    assert [change['key'] for change in ChangeFeed(db.users.journal).read()] == ['Ann']
+    assert db.users.pending == [] and db.users.journal_seq == 1
@@ -0,0 +1,74 @@
+import json
+import threading
+from jsoner import Database, Counters, ChangeFeed
+
+def test_incr_returns_value(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.add('key', 1)
+
+    assert db.incr('key', 2) == 3
+    assert db.decr('key') == 2
+
+def test_incr_many(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.add('views', 100)
+
+    assert db.incr_many({'views': 1, 'likes': 5}, create=True) == {'views': 101, 'likes': 5}
+
+def test_counters(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), journal=str(tmp_path / 'data.journal'))
+    db.add('views', 100)
+    counters = Counters(db)
+
+    assert counters.incr('views') == 101
+    assert counters.incr_many({'views': 2, 'likes': 1}) == {'views': 103, 'likes': 1}
+    assert db.data['views'] == 100
+
+    assert db.get('views') == 103
+    assert db.get('likes') == 1
+
+    counters.incr('views', 5)
+    db.commit()
+
+    assert json.loads((tmp_path / 'data.json').read_text())['views'] == 108
+    assert [e['delta'] for e in ChangeFeed(str(tmp_path / 'data.journal')) if e['event'] == 'incr'] == [3, 5]
+
+def test_counters_threads(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), autocommit=True)
+    counters = Counters(db, interval=0.01)
+
+    def work():
+        for _ in range(1000): counters.incr('hits')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    counters.close()
+
+    assert db.get('hits') == 4000
+    assert json.loads((tmp_path / 'data.json').read_text())['hits'] == 4000
+
+def test_background_flush_with_commit(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    counters = Counters(db, interval=0.0005)
+    stop = threading.Event()
+
+    def increment():
+        number = 0
+        while not stop.is_set():
+            counters.incr(f'new{number}')
+            number += 1
+
+    thread = threading.Thread(target=increment)
+    thread.start()
+
+    try:
+        for _ in range(200): db.commit()
+    finally:
+        stop.set()
+        thread.join()
+        counters.close()
+
+    db.commit()
+    assert len(json.loads((tmp_path / 'data.json').read_text())) == len(db.data)
@@ -0,0 +1,67 @@
+import json
+import pytest
+from jsoner import Database, Eviction
+from jsoner.tags import ttl_tag
+
+def test_max_keys_drop(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), key_index=True)
+    events = []
+    db.subscribe('', events.append)
+    Eviction(db, max_keys=3, samples=10)
+
+    for number in range(3): db.add(f'key {number}', number)
+    db.get('key 0')
+    db.add('key 3', 3)
+
+    assert sorted(db.keys()) == ['key 0', 'key 2', 'key 3']
+    assert list(db.index) == ['key 0', 'key 2', 'key 3']
+    assert events[-1]['event'] == 'evict'
+    assert 'key 1' not in db.data[db.settings]['tags']
+
+def test_lfu(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    Eviction(db, max_keys=2, policy='lfu', samples=10)
+
+    db.add('hot', 1)
+    db.add('cold', 2)
+    for _ in range(5): db.get('hot')
+    db.get('cold')
+    db.add('new', 3)
+
+    assert 'cold' not in db and 'hot' in db
+
+def test_ttl_first(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    Eviction(db, max_keys=2, policy='ttl', samples=10)
+
+    db.add('forever', 1)
+    db.add('short', 2, {ttl_tag: 10})
+    db.get('short')
+    db.add('new', 3)
+
+    assert db.keys() == ['forever', 'new']
+
+def test_spill(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), autocommit=True)
+    eviction = Eviction(db, max_memory=40, spill=str(tmp_path / 'data.cold'), samples=10)
+
+    db.add('a', 'x' * 20, {ttl_tag: 60})
+    db.add('b', 'y' * 20)
+
+    assert 'a' not in db.data and 'a' in db
+    assert sorted(db.keys()) == ['a', 'b']
+    assert 'a' in json.loads((tmp_path / 'data.json').read_text())['__settings__']['cold']
+
+    assert db.get('a') == 'x' * 20
+    assert 'b' not in db.data and 'ttl' in db.data[db.settings]['tags']['a']
+
+    db.update('b', 'z')
+    db.delete('a')
+    assert db.items() == [('b', 'z')]
+
+    eviction.compact()
+    assert (tmp_path / 'data.cold').stat().st_size == 0
+
+def test_policy_error(tmp_path):
+    with pytest.raises(ValueError):
+        Eviction(Database(str(tmp_path / 'data.json')), policy='random')
@@ -0,0 +1,72 @@
+import time
+from jsoner import Database, ChangeFeed
+from jsoner.tags import ttl_tag
+
+def test_subscribe_prefix(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    events = []
+    db.subscribe('user:', events.append)
+
+    db.add('user:1', 1)
+    db.add('other', 1)
+    db.incr('user:1', 2)
+    db.update('user:1', 10)
+    db.delete('user:1')
+
+    assert [(e['event'], e['key'], e['value']) for e in events] == [
+        ('add', 'user:1', 1), ('incr', 'user:1', 3), ('update', 'user:1', 10), ('delete', 'user:1', None)
+    ]
+
+def test_subscribe_predicate_and_unsubscribe(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    events = []
+    subscription = db.subscribe(lambda key: key.endswith(':name'), events.append)
+
+    db.add('user:1:name', 'Ann')
+    db.add('user:1:age', 30)
+    db.unsubscribe(subscription)
+    db.add('user:2:name', 'Bob')
+
+    assert [e['key'] for e in events] == ['user:1:name']
+
+def test_subscribe_expire(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    events = []
+    db.subscribe('', events.append)
+
+    db.add('key', 'value', {ttl_tag: 0.01})
+    time.sleep(0.02)
+    db.get('key')
+
+    assert events[-1]['event'] == 'expire'
+    assert 'key' not in db
+
+def test_journal(tmp_path):
+    journal = str(tmp_path / 'data.journal')
+    db = Database(str(tmp_path / 'data.json'), journal=journal)
+    feed = ChangeFeed(journal)
+
+    db.add('a', 1)
+    assert feed.read() == []
+
+    db.commit()
+    assert [e['key'] for e in feed.read()] == ['a']
+
+    db.add('b', 2)
+    db.discard()
+    db.add('c', 3)
+    db.commit()
+
+    events = feed.read()
+    assert [(e['seq'], e['key']) for e in events] == [(2, 'c')]
+    assert [e['seq'] for e in feed.read(since=0)] == [1, 2]
+
+def test_journal_seq_continues(tmp_path):
+    journal = str(tmp_path / 'data.journal')
+    db = Database(str(tmp_path / 'data.json'), journal=journal, autocommit=True)
+    db.add('a', 1)
+
+    db = Database(str(tmp_path / 'data.json'), journal=journal, autocommit=True)
+    db.add('b', 1)
+
+    assert [e['seq'] for e in ChangeFeed(journal)] == [1, 2]
@@ -0,0 +1,72 @@
+import pytest
+from jsoner import Database
+from jsoner.index import KeyIndex
+
+keys = ['post:1', 'user:10:name', 'user:1:age', 'user:1:name', 'user:2:name', 'user:\U0010ffff']
+
+def test_key_index():
+    index = KeyIndex(reversed(keys))
+
+    assert index.prefix('user:1:') == ['user:1:age', 'user:1:name']
+    assert index.count_prefix('user:') == 5
+    assert index.prefix('user:\U0010ffff') == ['user:\U0010ffff']
+    assert index.range('user:1', 'user:2') == ['user:10:name', 'user:1:age', 'user:1:name']
+    assert index.prefix('') == keys
+
+    index.remove('post:1')
+    index.add('user:1:age')
+    assert list(index) == keys[1:]
+
+@pytest.mark.parametrize('key_index', [True, False])
+def test_database_prefix_scan(tmp_path, key_index):
+    db = Database(str(tmp_path / 'data.json'), key_index=key_index)
+
+    for number, key in enumerate(keys):
+        db.add(key, number)
+
+    assert db.scan_prefix('user:1:') == [('user:1:age', 2), ('user:1:name', 3)]
+    assert db.range('user:2', None) == [('user:2:name', 4), ('user:\U0010ffff', 5)]
+    assert db.count_prefix('user:') == 5
+
+    assert db.delete_prefix('user:1') == 3
+    assert db.keys() == ['post:1', 'user:2:name', 'user:\U0010ffff']
+    assert db.count_prefix('user:1') == 0
+
+def test_index_follows_discard(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), key_index=True)
+    db.add('a', 1)
+    db.commit()
+
+    db.add('b', 2)
+    db.discard()
+
+    assert list(db.index) == ['a']
+
+def test_blocks_match_sorted_list(monkeypatch):
+    import random
+    from jsoner import index as index_module
+    monkeypatch.setattr(index_module, 'load', 4)
+
+    rng = random.Random(0)
+    index, expected = KeyIndex(), set()
+
+    for _ in range(2000):
+        key = f'k{rng.randrange(300)}'
+        if rng.random() < 0.6: index.add(key); expected.add(key)
+        else: index.remove(key); expected.discard(key)
+
+    index.update(f'k{number}' for number in range(250, 400))
+    expected.update(f'k{number}' for number in range(250, 400))
+
+    assert list(index) == sorted(expected) and len(index) == len(expected)
+    assert index.prefix('k1') == sorted(key for key in expected if key.startswith('k1'))
+    assert index.count_prefix('k2') == sum(key.startswith('k2') for key in expected)
+    assert index.range('k15', 'k3') == sorted(key for key in expected if 'k15' <= key < 'k3')
+    assert max(map(len, index.blocks)) <= 8
+
+def test_load_updates_index_once(tmp_path):
+    db = Database(str(tmp_path / 'data.json'), key_index=True)
+    db.add('b', 0)
+    db.load([(f'a{number}', number, None) for number in range(100)])
+
+    assert list(db.index) == sorted([f'a{number}' for number in range(100)] + ['b'])
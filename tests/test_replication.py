@@ -0,0 +1,102 @@
+import multiprocessing
+import time
+from jsoner import Database, Primary, Replica
+from jsoner.tags import ttl_tag
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def run_primary(path, address, ready, go, written, done):
+    db = Database(path)
+    primary = Primary(db, address, heartbeat=0.05).start()
+    db.add('a', 1)
+    ready.set()
+
+    go.wait(5)
+    db.add('b', {'x': 1}, {ttl_tag: 60})
+    db.incr('a', 5)
+    db.update('b', {'x': 2})
+    db.add('c', 3)
+    db.delete('c')
+    written.set()
+
+    done.wait(5)
+    primary.close()
+
+def test_two_processes(tmp_path):
+    address = str(tmp_path / 'primary.sock')
+    ready, go, written, done = (multiprocessing.Event() for _ in range(4))
+    process = multiprocessing.Process(target=run_primary, args=(str(tmp_path / 'data.json'), address, ready, go, written, done))
+    process.start()
+
+    try:
+        assert ready.wait(5)
+        replica = Replica(Database(str(tmp_path / 'replica.json')), address).start()
+        assert replica.wait(5)
+        assert replica.db.get('a') == 1
+
+        go.set()
+        assert written.wait(5)
+        wait_for(lambda: replica.seq == 6)
+
+        assert replica.db.items() == [('a', 6), ('b', {'x': 2})]
+        assert 'ttl' in replica.db.data[replica.db.settings]['tags']['b']
+        assert replica.lag is not None and replica.lag < 5
+        wait_for(lambda: replica.behind == 0)
+    finally:
+        done.set()
+        process.join(5)
+        replica.close()
+
+def test_catch_up(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    primary = Primary(db, ('127.0.0.1', 0)).start()
+    db.add('a', 1)
+
+    replica_db = Database(str(tmp_path / 'replica.json'))
+    replica = Replica(replica_db, primary.address).start()
+    assert replica.wait(5)
+    replica.close()
+
+    replica_db.data['local'] = True
+    db.incr('a')
+    db.add('b', 2)
+
+    replica = Replica(replica_db, primary.address).start()
+    wait_for(lambda: replica.seq == 3)
+    replica.close()
+
+    # недостающие изменения взяты из памяти источника, а не из копии данных
+    assert replica_db.get('local') is True
+    assert replica_db.get('a') == 2
+
+    promoted = replica.promote(('127.0.0.1', 0))
+    replica_db.add('c', 3)
+    assert replica.seq == 3 and replica_db.seq == 4
+
+    promoted.close()
+    primary.close()
+
+def test_snapshot_when_backlog_is_short(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    primary = Primary(db, ('127.0.0.1', 0), backlog=2).start()
+
+    replica_db = Database(str(tmp_path / 'replica.json'))
+    replica = Replica(replica_db, primary.address).start()
+    assert replica.wait(5)
+    replica.close()
+
+    replica_db.data['local'] = True
+    for number in range(5): db.add(f'key {number}', number)
+    db.drop()
+    db.add('key', 'value')
+
+    replica = Replica(replica_db, primary.address).start()
+    wait_for(lambda: replica.seq == 7)
+    replica.close()
+    primary.close()
+
+    assert replica_db.items() == [('key', 'value')]
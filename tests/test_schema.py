@@ -0,0 +1,67 @@
+import pytest
+from jsoner import Database
+from jsoner.errors import SchemaError, KeyAddError
+from jsoner.schema import compile_schema
+from jsoner.tags import typing_tag
+
+@pytest.mark.parametrize(
+        'schema, value, valid',
+        [
+            [int,                        1,                               True],
+            [float,                      1,                               True],
+            [str,                        1,                               False],
+            [(int, None),                None,                            True],
+            [[int],                      [1, 2, 3],                       True],
+            [[int],                      [1, '2'],                        False],
+            [{'name': str, 'age?': int}, {'name': 'Ann'},                 True],
+            [{'name': str, 'age?': int}, {'name': 'Ann', 'age': '30'},    False],
+            [{'name': str},              {},                              False],
+            [{'name': str},              {'name': 'Ann', 'extra': {1, 2}}, False],
+            [dict,                       {'a': [object()]},               False],
+        ]
+)
+def test_compile_schema(schema, value, valid):
+    validate = compile_schema(schema)
+
+    if valid: validate(value)
+    else:
+        with pytest.raises(SchemaError):
+            validate(value)
+
+def test_database_schema(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.set_schema('user:', {'name': str, 'age?': int})
+
+    db.add('user:1', {'name': 'Ann', 'age': 30})
+    db.add('other', {'name': 1})
+
+    with pytest.raises(SchemaError):
+        db.add('user:2', {'name': 'Bob', 'age': '25'})
+
+    with pytest.raises(SchemaError):
+        db.update('user:1', {'age': 31})
+
+    assert db['user:1'] == {'name': 'Ann', 'age': 30}
+    assert 'user:2' not in db
+
+def test_schema_with_typing_tag(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.set_schema('user:', {'name': str, 'age?': int})
+    db.add('user:1', {'name': 'Ann'}, {typing_tag: True})
+
+    db.set('user:1', ('age', 30))
+    assert db['user:1'] == {'name': 'Ann', 'age': 30}
+
+def test_validate_false(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.set_schema('user:', {'name': str})
+
+    db.add('user:1', {'name': 'Ann'})
+
+    with pytest.raises(KeyAddError):
+        db.add('user:1', {'name': 'Bob'})
+
+    db.add('user:1', {'name': 'Bob'}, validate=False)
+    db.update('user:1', 'trusted', validate=False)
+
+    assert db['user:1'] == 'trusted'
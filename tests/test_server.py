@@ -0,0 +1,63 @@
+import pytest
+from jsoner import Database, Cluster, errors
+from jsoner.server import Server, RemoteDatabase
+from jsoner.tags import const_tag
+
+@pytest.fixture
+def remote(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    server = Server(db, ('127.0.0.1', 0)).start()
+    remote = RemoteDatabase(server.address)
+    yield remote
+    remote.close()
+    server.close()
+
+def test_remote_api(remote):
+    remote.add('pi', 3.14, {const_tag: True})
+    remote['counter'] = 1
+
+    assert remote['pi'] == 3.14
+    assert remote.incr('counter', 2) == 3
+    assert 'counter' in remote
+    assert remote.items() == [('pi', 3.14), ('counter', 3)]
+
+    with pytest.raises(errors.ValueIsConstant):
+        remote.update('pi', 4)
+
+    with pytest.raises(errors.KeyNotFound):
+        remote.incr('missing')
+
+def test_find(remote):
+    for number in range(5): remote.add(f'key {number}', {'n': number})
+
+    assert remote.find_all(('n', '>=', 3)) == [('key 3', {'n': 3}), ('key 4', {'n': 4})]
+    assert remote.find_one(lambda value: value['n'] == 2) == ('key 2', {'n': 2})
+
+def test_pipeline_and_batch(remote):
+    remote.add('a', 0)
+
+    with remote.pipeline() as pipe:
+        for _ in range(100): pipe.incr('a')
+        pipe.get('a')
+
+    assert pipe.results[-1] == 100
+    assert remote.batch([('incr', ['a']), ('get', ['a'])]) == [101, 101]
+
+def test_unix_socket_cluster(tmp_path):
+    (tmp_path / 'db').mkdir()
+    Database(str(tmp_path / 'db' / 'users.json'))
+
+    class db(Cluster):
+        folder_path = str(tmp_path / 'db')
+
+    server = Server(db, str(tmp_path / 'jsoner.sock')).start()
+    remote = RemoteDatabase(str(tmp_path / 'jsoner.sock'), db='users')
+
+    remote.set('Ann', 30)
+    assert db.users.get('Ann') == 30
+
+    with pytest.raises(errors.KeyNotFound):
+        RemoteDatabase(str(tmp_path / 'jsoner.sock'), db='missing').get('Ann')
+
+    remote.close()
+    server.close()
@@ -0,0 +1,56 @@
+import multiprocessing
+import time
+import pytest
+from jsoner import Database, SharedDatabase
+from jsoner.tags import ttl_tag
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.add('Ann', {'age': 30})
+    db.add('Bob', {'age': 25})
+    db.set_default(0)
+    return db
+
+def test_shared_read(tmp_path, db):
+    db.add('gone', 1, {ttl_tag: -1})
+    db.add('soon', 1, {ttl_tag: 0.05})
+    SharedDatabase.build(db, str(tmp_path / 'data.shared'))
+
+    shared = SharedDatabase(str(tmp_path / 'data.shared'))
+
+    assert shared.keys() == ['Ann', 'Bob', 'soon']
+    assert shared['Ann'] == {'age': 30}
+    assert shared['Ann'] is shared['Ann']
+    assert shared.find_all(lambda value: value != 1 and value['age'] > 26) == [('Ann', {'age': 30})]
+    assert shared['missing'] == 0
+
+    time.sleep(0.06)
+    assert shared['soon'] == 0
+
+def test_shared_reload(tmp_path, db):
+    path = str(tmp_path / 'data.shared')
+    assert SharedDatabase.build(db, path) == 1
+
+    shared = SharedDatabase(path, check_interval=0)
+    db.update('Ann', {'age': 31})
+    assert SharedDatabase.build(db, path) == 2
+
+    assert shared['Ann'] == {'age': 31}
+    assert shared.generation == 2
+
+def read_in_process(path, queue):
+    queue.put(SharedDatabase(path).items())
+
+def test_shared_processes(tmp_path, db):
+    path = str(tmp_path / 'data.shared')
+    SharedDatabase.build(db, path)
+
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=read_in_process, args=(path, queue)) for _ in range(2)]
+    for process in processes: process.start()
+
+    results = [queue.get(timeout=10) for _ in processes]
+    for process in processes: process.join()
+
+    assert results == [[('Ann', {'age': 30}), ('Bob', {'age': 25})]] * 2
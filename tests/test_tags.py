@@ -1,7 +1,7 @@
 import time
 from tests.conftest import clear_db, db
 import pytest
-from jsoner.tags import const_tag, unique_tag, foreign_key_tag, ttl_tag, typing_tag
+from jsoner.tags import NewTag, const_tag, unique_tag, foreign_key_tag, ttl_tag, typing_tag
 from jsoner.errors import ValueIsConstant, UniqueValueError, ForeignKeyError
 
 def test_const():
@@ -57,3 +57,90 @@ def test_typing_dict(clear_db):
 
     db.set('dict', ('data.text', 'Hello world') )
     assert db['dict'] =={"id": 11111111, "data": {"text": "Hello world"}}
+
+class counting_tag(NewTag):
+    calls = []
+
+    def read(db, key, value, tag_arg):
+        counting_tag.calls.append('read')
+        return value
+
+    def read_many(db, keys, values, tag_args):
+        counting_tag.calls.append(('read_many', len(keys)))
+        return [value * tag_arg for value, tag_arg in zip(values, tag_args)]
+    
+    def update_many(db, keys, old_values, new_values, tag_args):
+        counting_tag.calls.append(('update_many', len(keys)))
+        return [old + new for old, new in zip(old_values, new_values)]
+
+def test_batch_hooks(clear_db):
+    counting_tag.calls.clear()
+    for number in range(3): db.add(f'counting {number}', number, {counting_tag: 10})
+    db.add('plain', 'value')
+
+    assert db.get_many(['counting 2', 'plain', 'missing', 'counting 1']) == [20, 'value', None, 10]
+    assert db.values() == [0, 10, 20, 'value']
+    assert counting_tag.calls == [('read_many', 2), ('read_many', 3)]
+
+    db.update_many({'counting 0': 5, 'counting 1': 5, 'plain': 'new'})
+    assert counting_tag.calls[-1] == ('update_many', 2)
+    assert db.data['counting 1'] == 6
+    assert db['plain'] == 'new'
+
+    db.update('counting 2', 1)
+    assert db.data['counting 2'] == 3
+
+def test_ttl_read_many(clear_db):
+    db.add('short', 1, {ttl_tag: 0.01})
+    db.add('long', 2, {ttl_tag: 60})
+    time.sleep(0.02)
+
+    assert db.items() == [('short', None), ('long', 2)]
+    assert db.keys() == ['long']
+
+def test_foreign_key_update_many(clear_db):
+    db.set('user_roles', ['admin', 'member'])
+    db.set('user1', 'admin', {foreign_key_tag: 'user_roles'})
+    db.set('user2', 'admin', {foreign_key_tag: 'user_roles'})
+
+    with pytest.raises(ForeignKeyError):
+        db.update_many({'user1': 'member', 'user2': 'guest'})
+
+    assert db['user1'] == 'admin'
+    db.update_many({'user1': 'member', 'user2': 'member'})
+    assert db.values()[1:] == ['member', 'member']
+
+def test_foreign_key_create(clear_db):
+    db.set('user_roles', ['admin', 'member'])
+    with pytest.raises(ForeignKeyError):
+        db.add('user1', 'guest', {foreign_key_tag: 'user_roles'})
+
+def test_foreign_key_referenced_list(clear_db):
+    db.set('user_roles', ['admin', 'moderator', 'member'])
+    db.set('user1', 'admin', {foreign_key_tag: 'user_roles'})
+    db.set('user2', 'member', {foreign_key_tag: 'user_roles'})
+
+    db.update('user_roles', ['admin', 'member', 'guest'])
+    db.set('user2', 'guest')
+
+    with pytest.raises(ForeignKeyError):
+        db.update('user_roles', ['member', 'guest'])
+
+    with pytest.raises(ForeignKeyError):
+        db.delete('user_roles')
+
+    assert db['user_roles'] == ['admin', 'member', 'guest']
+
+    db.delete('user1')
+    db.delete('user2')
+    db.delete('user_roles')
+    assert db.keys() == []
+
+def test_check_foreign_keys(clear_db):
+    db.set('user_roles', ['admin', 'member'])
+    db.set('user1', 'admin', {foreign_key_tag: 'user_roles'})
+    db.set('user2', 'member', {foreign_key_tag: 'user_roles'})
+    assert db.check_foreign_keys() == []
+
+    db.data['user2'] = 'guest'
+    assert db.check_foreign_keys() == [('user2', 'guest', 'user_roles')]
@@ -0,0 +1,60 @@
+import io
+import pytest
+from jsoner import Database
+from jsoner.errors import SchemaError
+from jsoner.tags import ttl_tag, const_tag
+
+@pytest.fixture
+def source(tmp_path):
+    db = Database(str(tmp_path / 'source.json'), key_index=True)
+    db.add('user:1', {'name': 'Ann'}, {ttl_tag: 60})
+    db.add('user:2', {'name': 'Bob'})
+    db.add('pi', 3.14, {const_tag: True})
+    return db
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_ndjson_round_trip(tmp_path, source, workers):
+    path = str(tmp_path / 'data.ndjson')
+    assert source.export_ndjson(path) == 3
+
+    db = Database(str(tmp_path / 'data.json'))
+    assert db.import_ndjson(path, batch_size=2, workers=workers) == 3
+
+    assert db.items() == source.items()
+    assert db.data[db.settings]['tags'] == source.data[source.settings]['tags']
+
+def test_ndjson_prefix_stream(tmp_path, source):
+    stream = io.StringIO()
+    assert source.export_ndjson(stream, prefix='user:') == 2
+
+    db = Database(str(tmp_path / 'data.json'))
+    db.add('user:1', 'old')
+    db.import_ndjson(io.StringIO(stream.getvalue()))
+
+    assert db.items() == [('user:1', {'name': 'Ann'}), ('user:2', {'name': 'Bob'})]
+
+def test_import_validates(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    db.set_schema('user:', {'name': str})
+
+    with pytest.raises(SchemaError):
+        db.import_ndjson(io.StringIO('{"key": "user:1", "value": {"name": 1}}\n'))
+
+    db.import_ndjson(io.StringIO('{"key": "user:1", "value": {"name": 1}}\n'), validate=False)
+    assert db['user:1'] == {'name': 1}
+
+def test_csv_round_trip(tmp_path):
+    db = Database(str(tmp_path / 'data.json'))
+    for key, value in [('name', 'Ann'), ('age', 30), ('score', 1.5), ('admin', True)]:
+        db.add(key, value)
+
+    path = str(tmp_path / 'data.csv')
+    assert db.export_csv(path) == 4
+
+    copy = Database(str(tmp_path / 'copy.json'))
+    assert copy.import_csv(path) == 4
+    assert copy.items() == db.items()
+
+    db.add('list', [1, 2])
+    with pytest.raises(TypeError):
+        db.export_csv(io.StringIO())